@@ -0,0 +1,174 @@
+"""
+Benchmarks DripPy against a local stub of the Drip API, no network access needed
+
+Usage:
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json
+
+Every scenario reports operations per second and request latency percentiles. With --compare
+the run fails when a scenario's throughput drops by more than --tolerance from the baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drip.drip import DripPy  # noqa: E402
+from drip.drip_retry import RetryPolicy  # noqa: E402
+from drip.metrics import RequestObserver  # noqa: E402
+from drip.transport import HTTPXTransport, RequestsTransport  # noqa: E402
+from stub_server import StubDripServer  # noqa: E402
+
+
+class LatencyRecorder(RequestObserver):
+    """
+    Keeps the latency of every request, the client histogram is too coarse for benchmarks
+    """
+    def __init__(self):
+        self.latencies = []
+
+    def after_request(self, event):
+        self.latencies.append(event.latency)
+
+    def percentile(self, percent):
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100.0))]
+
+
+def subscribers(count):
+    for i in range(count):
+        yield ("{}@example.com".format(i), "Customer", None)
+
+
+def scenarios(options):
+    """
+    Returns:
+        list: (name, operations, callable taking a client) tuples
+    """
+    calls = options.calls
+    result = [
+        ("add_subscriber_tag", calls,
+         lambda drip: [drip.add_subscriber_tag("{}@example.com".format(i), "Customer") for i in range(calls)]),
+        ("fetch_subscriber", calls,
+         lambda drip: [drip.fetch_subscriber("{}@example.com".format(i)) for i in range(calls)]),
+        ("fetch_subscribers", calls,
+         lambda drip: drip.fetch_subscribers(("{}@example.com".format(i) for i in range(calls)),
+                                             workers=options.workers)),
+        ("fetch_subscriber_typed", calls,
+         lambda drip: [drip.fetch_subscriber("{}@example.com".format(i), typed=True).subscribers
+                       for i in range(calls)]),
+        ("iter_subscribers", options.listing,
+         lambda drip: sum(1 for _ in drip.iter_subscribers())),
+        ("iter_subscribers_typed", options.listing,
+         lambda drip: sum(1 for _ in drip.iter_subscribers(typed=True))),
+    ]
+    for size in options.sizes:
+        result.append(("update_subscriber_tag_with_new_batch_{}".format(size), size,
+                       lambda drip, size=size: drip.update_subscriber_tag_with_new_batch(subscribers(size))))
+        result.append(("update_subscriber_tag_with_new_batch_{}_workers_{}".format(size, options.workers), size,
+                       lambda drip, size=size: drip.update_subscriber_tag_with_new_batch(
+                           subscribers(size), workers=options.workers)))
+    return result
+
+
+def create_transport(options):
+    if options.transport == "httpx":
+        return HTTPXTransport(http2=False, max_connections=options.workers,
+                              max_keepalive_connections=options.workers)
+    return RequestsTransport(pool_maxsize=options.workers)
+
+
+def run(options):
+    results = {}
+    with StubDripServer(latency=options.latency, error_rate=options.error_rate, throttle_rate=options.throttle_rate,
+                        retry_after=0, subscribers=options.listing, seed=0) as server:
+        for name, operations, scenario in scenarios(options):
+            if options.only and not any(part in name for part in options.only):
+                continue
+            recorder = LatencyRecorder()
+            retry_policy = None
+            if options.error_rate or options.throttle_rate:
+                retry_policy = RetryPolicy(tries=5, delay=0.01, max_delay=0.1)
+            drip = DripPy("token", "1", endpoint=server.endpoint, transport=create_transport(options),
+                          retry_policy=retry_policy, observers=[recorder])
+            start = time.time()
+            scenario(drip)
+            seconds = time.time() - start
+            drip.close()
+            results[name] = {
+                "operations": operations,
+                "requests": len(recorder.latencies),
+                "seconds": round(seconds, 4),
+                "throughput": round(operations / seconds, 2),
+                "p50_ms": round(recorder.percentile(50) * 1000, 3),
+                "p99_ms": round(recorder.percentile(99) * 1000, 3),
+            }
+            print("{:<60} {:>12.2f} ops/s  p50 {:>8.3f} ms  p99 {:>8.3f} ms".format(
+                name, results[name]["throughput"], results[name]["p50_ms"], results[name]["p99_ms"]))
+    return {
+        "python": platform.python_version(),
+        "options": {key: value for key, value in vars(options).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Prints the throughput change of every scenario found in both reports
+    Returns:
+        list: Names of the scenarios slower than the baseline by more than tolerance
+    """
+    regressions = []
+    for name, result in sorted(report["results"].items()):
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        change = result["throughput"] / previous["throughput"] - 1
+        print("{:<60} {:>+8.1%}".format(name, change))
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Benchmarks DripPy against a local stub of the Drip API")
+    parser.add_argument("--calls", type=int, default=1000, help="single calls per scenario")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[10000, 100000, 1000000], help="comma separated batch sizes")
+    parser.add_argument("--listing", type=int, default=10000, help="subscribers listed by iter_subscribers")
+    parser.add_argument("--workers", type=int, default=4, help="workers of the parallel scenarios")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stub delays every response by")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--transport", choices=("requests", "httpx"), default="requests",
+                        help="HTTP stack the client sends requests through")
+    parser.add_argument("--only", nargs="*", help="only run scenarios whose name contains one of these")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed throughput drop when comparing")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    options = parse_args(args)
+    report = run(options)
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as baseline:
+            regressions = compare(report, json.load(baseline), options.tolerance)
+        if regressions:
+            print("Throughput regressions: {}".format(", ".join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
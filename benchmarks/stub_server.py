@@ -0,0 +1,143 @@
+"""
+An in-process HTTP server imitating the Drip v2 endpoints used by DripPy, for offline benchmarks
+It answers like Drip does, with configurable latency, server errors and 429 throttling
+"""
+import json
+import random
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+
+class StubDripServer(object):
+    """
+    Runs the stub Drip API on a random local port in a background thread
+    """
+    def __init__(self, latency=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1, subscribers=10000, seed=None):
+        """
+        Args:
+            latency (float): Optional, seconds every response is delayed by
+            error_rate (float): Optional, share of requests answered with a 500
+            throttle_rate (float): Optional, share of requests answered with a 429
+            retry_after (int): Optional, Retry-After header of the 429 responses
+            subscribers (int): Optional, number of subscribers in the listing endpoint
+            seed (int): Optional, seed of the error and throttle injection
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.subscribers = subscribers
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def endpoint(self):
+        """
+        str: The endpoint to pass to DripPy
+        """
+        return "http://127.0.0.1:{}/v2/".format(self._server.server_address[1])
+
+    def start(self):
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), _StubDripHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def record(self, body_size):
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += body_size
+            roll = self.random.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def subscriber(self, subscriber_id):
+        subscriber_id = str(subscriber_id)
+        email = subscriber_id if "@" in subscriber_id else "{}@example.com".format(subscriber_id)
+        return {"id": subscriber_id, "email": email, "status": "active", "tags": ["Customer"],
+                "custom_fields": {"shirt_size": "Medium"}, "links": {"account": "1"}}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _StubDripHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.answer()
+
+    def do_POST(self):
+        self.answer()
+
+    def answer(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if stub.latency:
+            time.sleep(stub.latency)
+        status = stub.record(len(body))
+        if status == 429:
+            return self.respond(429, {"errors": [{"code": "too_many_requests"}]},
+                                {"Retry-After": str(stub.retry_after)})
+        if status is not None:
+            return self.respond(status, {"errors": [{"code": "server_error"}]})
+        url = urlparse(self.path)
+        segments = url.path.strip("/").split("/")[2:]
+        if self.command == "POST":
+            if segments[-1] == "batches":
+                return self.respond(202, {})
+            return self.respond(200, {"links": {}, "subscribers": [stub.subscriber("stub")]})
+        if len(segments) == 2:
+            return self.respond(200, {"links": {}, "subscribers": [stub.subscriber(segments[1])]})
+        query = parse_qs(url.query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["100"])[0])
+        total_pages = max(1, (stub.subscribers + per_page - 1) // per_page)
+        first = (page - 1) * per_page
+        subscribers = [stub.subscriber(i) for i in range(first, min(first + per_page, stub.subscribers))]
+        self.respond(200, {"links": {}, "meta": {"page": page, "count": len(subscribers), "total_pages": total_pages,
+                                                 "total_count": stub.subscribers}, "subscribers": subscribers})
+
+    def respond(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
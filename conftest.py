@@ -0,0 +1,5 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore += ["drip/aio.py", "drip/tests/test_aio.py"]
@@ -1,2 +1,2 @@
-from drip_retry import *
-from drip import *
+from .drip_retry import *
+from .drip import *
@@ -0,0 +1,118 @@
+import threading
+from itertools import islice
+
+
+class AdaptiveBatcher(object):
+    """
+    Sizes the partitions of a bulk update from the outcome of the partitions already sent
+    Partitions are capped by record count and by encoded bytes. The record count grows while Drip
+    answers faster than target_latency, shrinks when it answers slower or fails, and is halved
+    along with the partition when Drip rejects a payload as too large (413)
+    """
+    def __init__(self, max_records=1000, max_bytes=1000000, min_records=10, initial_records=None,
+                 target_latency=1.0, grow=1.5, shrink=0.5):
+        """
+        Args:
+            max_records (int): Optional, most records sent in one request, the batches API accepts 1000
+            max_bytes (int): Optional, most encoded bytes sent in one request
+            min_records (int): Optional, the record count never shrinks below this
+            initial_records (int): Optional, record count of the first partition, defaults to max_records
+            target_latency (float): Optional, seconds per request above which partitions shrink,
+                they grow when requests take less than half of it
+            grow (float): Optional, factor applied to the record count after a fast request
+            shrink (float): Optional, factor applied to the record count after a slow or failed request
+        """
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.min_records = min(min_records, max_records)
+        self.size = initial_records or max_records
+        self.target_latency = target_latency
+        self.grow = grow
+        self.shrink = shrink
+        self.bytes_per_record = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "AdaptiveBatcher(size={}, limit={})".format(self.size, self.limit)
+
+    @property
+    def limit(self):
+        """
+        int: Records of the next partition, the record count capped by the bytes observed per record
+        """
+        limit = self.size
+        if self.bytes_per_record:
+            limit = min(limit, int(self.max_bytes // self.bytes_per_record))
+        return max(limit, 1)
+
+    def chunks(self, records):
+        """
+        Yields partitions of records sized by the limit at the time each one is built
+        Args:
+            records: Python List, generator or any other iterable, consumed lazily
+
+        Returns:
+            Yields lists of records
+        """
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, self.limit))
+            if not chunk:
+                return
+            yield chunk
+
+    def encode(self, records, build_payload, encode):
+        """
+        Encodes a partition, splitting it in halves until every body fits max_bytes
+        Args:
+            records (list): The records of the partition
+            build_payload: Callable turning a list of records into a request payload
+            encode: Callable turning a payload into the request body, e.g. DripPy.encode_payload
+
+        Returns:
+            list: (records, body) tuples in input order, a single record over max_bytes is left to Drip
+        """
+        body = encode(build_payload(records))
+        self.observe_bytes(len(records), len(body))
+        if len(body) <= self.max_bytes or len(records) == 1:
+            return [(records, body)]
+        middle = len(records) // 2
+        return self.encode(records[:middle], build_payload, encode) + \
+            self.encode(records[middle:], build_payload, encode)
+
+    def observe_bytes(self, records, size):
+        """
+        Args:
+            records (int): Number of records encoded
+            size (int): Length of the encoded body
+        """
+        bytes_per_record = float(size) / records
+        with self._lock:
+            if self.bytes_per_record is None:
+                self.bytes_per_record = bytes_per_record
+            else:
+                self.bytes_per_record = 0.8 * self.bytes_per_record + 0.2 * bytes_per_record
+
+    def observe(self, records, latency, status=None, error=None, body_size=None):
+        """
+        Adjusts the record count after a request, a 413 also lowers max_bytes below the rejected body
+        Args:
+            records (int): Number of records sent
+            latency (float): Seconds the request took
+            status (int): Optional, the response status code, None when the request raised
+            error (Exception): Optional, the exception raised by the request
+            body_size (int): Optional, length of the request body
+        """
+        with self._lock:
+            if status == 413:
+                if body_size is not None and records > 1:
+                    self.max_bytes = min(self.max_bytes, body_size - 1)
+                size = min(self.size, records // 2)
+            elif error is not None or status is None or status == 429 or status >= 500 or \
+                    latency > self.target_latency:
+                size = int(self.size * self.shrink)
+            elif latency < self.target_latency / 2 and records >= self.size:
+                size = max(int(self.size * self.grow), self.size + 1)
+            else:
+                size = self.size
+            self.size = min(max(size, self.min_records), self.max_records)
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from .batch import SubscriberBatch
+from .helpers import build_batch_payload, chunks
+from .mixins import DripQueryPathMixin
+from .models import LazyResponse
+from .rate_limit import parse_retry_after
+from .report import BatchReport, PartitionResult
+from .serializers import encode_payload, is_gzipped
+from .transport import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDripPy(DripQueryPathMixin):
+    """
+    The asyncio counterpart of DripPy, every API method is a coroutine
+    Requires aiohttp (pip install drip-py[async]) and Python 3.5+
+    https://www.getdrip.com/docs/rest-api#subscribers
+    """
+    def __init__(self, token, account_id, endpoint='https://api.getdrip.com/v2/', pool_maxsize=100,
+                 pool_maxsize_per_host=0, max_in_flight=10, timeout=DEFAULT_TIMEOUT, rate_limiter=None,
+                 serializer=json.dumps, compress_threshold=None, circuit_breaker=None):
+        """
+        Args:
+            token: Drip generated token
+            account_id: Drip generated account id
+            endpoint: Optional, already set to 'https://api.getdrip.com/v2/'
+            pool_maxsize (int): Optional, max number of open connections, 0 for no limit
+            pool_maxsize_per_host (int): Optional, max number of open connections per host, 0 for no limit
+            max_in_flight (int): Optional, max number of requests awaiting a response at once
+            timeout (float or tuple): Optional, timeout in seconds or a (connect, read) tuple for every request,
+                defaults to DEFAULT_TIMEOUT, None waits forever
+            rate_limiter (TokenBucket): Optional, budget every request waits on without blocking the event loop
+            serializer: Optional, callable encoding payloads to JSON, see serializers.fastest_json_encoder
+            compress_threshold (int): Optional, gzip request bodies of at least this many bytes
+            circuit_breaker (CircuitBreaker): Optional, see DripPy
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncDripPy requires aiohttp, install it with `pip install drip-py[async]`")
+        super(AsyncDripPy, self).__init__(token, account_id, endpoint)
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.serializer = serializer
+        self.compress_threshold = compress_threshold
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def session(self):
+        """
+        The non-blocking connection pool shared by every request of this client, created on first use so that it
+        binds to the running event loop
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, limit_per_host=self.pool_maxsize_per_host)
+            self._session = aiohttp.ClientSession(connector=connector, auth=aiohttp.BasicAuth(self.token, ''),
+                                                  timeout=self.create_timeout(self.timeout))
+        return self._session
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    @staticmethod
+    def create_timeout(timeout):
+        """
+        Converts a requests style timeout into an aiohttp one
+        Args:
+            timeout (float or tuple): Timeout in seconds or a (connect, read) tuple
+
+        Returns:
+            aiohttp.ClientTimeout
+        """
+        if timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(timeout, tuple):
+            return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        return aiohttp.ClientTimeout(total=timeout)
+
+    async def close(self):
+        """
+        Closes the pooled connections held by this client
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def encode_payload(self, payload):
+        """
+        Encodes a payload the way send_request would, the result can be passed to
+        send_request any number of times without being encoded again
+        Args:
+            payload (dict): The payload to encode
+
+        Returns:
+            str or bytes: The request body
+        """
+        return encode_payload(payload, self.serializer, self.compress_threshold)
+
+    async def fetch_subscriber(self, subscriber_id):
+        """
+        Fetches a subscriber from Drip
+        GET /:account_id/subscribers/:subscriber_id
+        Args:
+            subscriber_id (int): The subscriber ID
+
+        Returns:
+            json:   {
+                      "links": { ... },
+                      "subscribers": [{ ... }]
+                    }
+        """
+        url = self.get_fetch_subscriber_query_path(subscriber_id)
+        return await self.send_request(url, method="GET")
+
+    async def unsubscribe_email(self, email, response_mode="status"):
+        """
+        Unsubscribe a lead from all campaigns
+        Args:
+            email (str): Email of the lead
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
+        """
+        url = self.get_unsubscribe_email_query_path(email)
+        return await self.send_request(url, response_mode=response_mode)
+
+    async def add_subscriber_tag(self, email, tag, response_mode="status"):
+        """
+        Uses post update API to add a given tag for an email, creates a new
+        subscriber if it doesn't exist in our list already
+        Args:
+            email (str): Email of the lead
+            tag (str): Tag to be added
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
+        """
+        url = self.get_update_subscriber_query_path()
+        return await self.send_request(url, {"subscribers": [{'email': email, 'tags': [tag]}]},
+                                       response_mode=response_mode)
+
+    async def remove_subscriber_tag(self, email, tag, response_mode="status"):
+        """
+        Uses post update API to remove a given tag for an email, creates a new
+        subscriber if it doesn't exist in our list already.
+        Args:
+            email (str): Email of the lead
+            tag (str): Tag to be removed
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
+        """
+        url = self.get_update_subscriber_query_path()
+        return await self.send_request(url, {"subscribers": [{'email': email, 'remove_tags': [tag]}]},
+                                       response_mode=response_mode)
+
+    async def update_subscriber_tag_with_new_batch(self, list_of_subscribers):
+        """
+        Uses post update API to add a given tag for an email, creates a new
+        subscriber if it doesn't exist in our list already. Partitions are
+        built lazily and sent concurrently, bounded by max_in_flight
+        Args:
+            list_of_subscribers (iterable): List, generator or any iterable of (email, tag, remove_tag) subscribers
+        Returns:
+            BatchReport: The status, latency and emails of every partition of 1000 subscribers,
+                see DripPy.update_subscriber_tag_with_new_batch
+        """
+        url = self.get_update_subscriber_query_path_batches()
+        return await self.send_batches(url, list_of_subscribers, build_batch_payload, lambda subscriber: subscriber[0])
+
+    async def update_subscribers(self, subscribers):
+        """
+        Uses the batches API to create or update subscribers with any number of tags, removed tags,
+        custom fields and other attributes, see DripPy.update_subscribers
+        Args:
+            subscribers (iterable): Iterable of subscriber dicts
+        Returns:
+            BatchReport: Same as update_subscriber_tag_with_new_batch
+        """
+        url = self.get_update_subscriber_query_path_batches()
+        return await self.send_batches(url, subscribers, lambda records: SubscriberBatch(records).payload(),
+                                       lambda subscriber: subscriber["email"])
+
+    async def send_batches(self, request_url, records, build_payload, key):
+        """
+        Partitions records in groups of 1000 and posts a payload for each of them concurrently,
+        bounded by max_in_flight
+        Args:
+            request_url (str): The batches URL to post to
+            records (iterable): Records to send, consumed lazily
+            build_payload: Callable turning a list of records into a request payload
+            key: Callable returning the email of a record
+        Returns:
+            BatchReport: One PartitionResult per partition in input order
+        """
+        report = BatchReport(request_url, build_payload, key)
+        pending = set()
+        try:
+            for index, partition_list in enumerate(chunks(records, 1000)):
+                if len(pending) >= self.max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        report.add(task.result())
+                pending.add(asyncio.ensure_future(self.send_partition(report, index, partition_list)))
+            for result in await asyncio.gather(*pending):
+                report.add(result)
+            pending = set()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        report.partitions.sort(key=lambda partition: partition.index)
+        return report
+
+    async def send_partition(self, report, index, records):
+        """
+        Posts one partition, see DripPy.send_partition
+        Args:
+            report (BatchReport): The report holding the URL, payload builder and email key
+            index (int): Position of the partition in the input
+            records (list): The records of the partition
+
+        Returns:
+            PartitionResult
+        """
+        emails = []
+        status = error = None
+        start = time.time()
+        try:
+            emails = [report.key(record) for record in records]
+            status = await self.send_request(report.request_url, self.encode_payload(report.build_payload(records)),
+                                             response_mode="status")
+        except Exception as e:
+            error = e
+        result = PartitionResult(index=index, status=status, latency=time.time() - start, attempts=1,
+                                 emails=emails, error=error, records=None)
+        if not result.ok:
+            logger.error("Error while sending partition {}. Status code: {}. Error: {}".format(index, status, error))
+            result = result._replace(records=records)
+        return result
+
+    async def send_request(self, request_url, payload=None, method="POST", response_mode="full"):
+        """
+        Dispatches the request and returns a response
+        Args:
+            request_url (str): The URL to request from
+            payload (dict or bytes): Optional, POST payloads can also be a body returned by encode_payload
+            method (str): Defaults to POST, other option is GET
+            response_mode (str): Optional, see DripPy.send_request
+
+        Returns:
+            json, the status code (int) or a LazyResponse depending on response_mode
+        """
+        if not payload:
+            payload = {}
+        headers = {
+            'content-type': 'application/json',
+            'Accept': 'application/json'
+        }
+        if method == "POST":
+            payload = self.encode_payload(payload)
+            if is_gzipped(payload):
+                headers['Content-Encoding'] = 'gzip'
+        endpoint = self.get_query_path_template(request_url)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request(self.account_id, endpoint)
+        if self.rate_limiter is not None:
+            while not self.rate_limiter.acquire(block=False):
+                await asyncio.sleep(self.rate_limiter.wait_time())
+        async with self.semaphore:
+            if method == "POST":
+                request = self.session.post(request_url, headers=headers, data=payload)
+            else:
+                request = self.session.get(request_url, params=payload)
+            status = error = None
+            try:
+                async with request as r:
+                    status = r.status
+                    if response_mode != "full":
+                        content = await r.read()
+                        if r.status == 429 and self.rate_limiter is not None:
+                            self.rate_limiter.pause(parse_retry_after(r.headers.get('Retry-After')))
+                        if r.status not in (200, 202):
+                            logger.error("Error while retrieving response. Status code: {}. Text: {}".format(
+                                r.status, content.decode('utf-8', 'replace')))
+                        return r.status if response_mode == "status" else LazyResponse(content, r.status)
+                    if r.status == 200:
+                        try:
+                            return await r.json()
+                        except Exception as e:
+                            logger.error("Error while retrieving response. Error: {}".format(str(e)))
+                            return {}
+                    elif r.status == 202:
+                        return {}
+                    else:
+                        if r.status == 429 and self.rate_limiter is not None:
+                            self.rate_limiter.pause(parse_retry_after(r.headers.get('Retry-After')))
+                        logger.error("Error while retrieving response. Status code: {}. Text: {}".format(
+                            r.status, await r.text()))
+                        return {}
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.after_request(self.account_id, endpoint, status, error)
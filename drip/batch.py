@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+from .helpers import email_key
+
+
+class SubscriberBatch(object):
+    """
+    Builds one batch of the subscribers batches API, every change made to the same email
+    is merged into a single subscriber entry, emails differing only by case are the same subscriber
+    https://www.getdrip.com/docs/rest-api#subscriber_batches
+    """
+    def __init__(self, subscribers=None):
+        """
+        Args:
+            subscribers (iterable): Optional, subscriber dicts to add, see add_subscriber
+        """
+        self._subscribers = OrderedDict()
+        for subscriber in subscribers or ():
+            self.add_subscriber(subscriber)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def __iter__(self):
+        return iter(self._subscribers.values())
+
+    def add(self, email, tags=None, remove_tags=None, custom_fields=None, **attributes):
+        """
+        Merges changes for an email into the batch, later changes win over earlier ones
+        Args:
+            email (str): Email of the lead
+            tags (list): Optional, tags to be added
+            remove_tags (list): Optional, tags to be removed
+            custom_fields (dict): Optional, custom fields to be set
+            attributes: Optional, any other subscriber attribute, e.g. time_zone or new_email
+        """
+        key = email_key(email)
+        subscriber = self._subscribers.get(key)
+        if subscriber is None:
+            subscriber = self._subscribers[key] = {"email": email}
+        for tag in tags or ():
+            self._move_tag(subscriber, tag, "tags", "remove_tags")
+        for tag in remove_tags or ():
+            self._move_tag(subscriber, tag, "remove_tags", "tags")
+        if custom_fields:
+            subscriber.setdefault("custom_fields", {}).update(custom_fields)
+        subscriber.update(attributes)
+
+    def add_subscriber(self, subscriber):
+        """
+        Merges a subscriber dict, as accepted by the API, into the batch
+        Args:
+            subscriber (dict): {"email": ..., "tags": [...], "remove_tags": [...], "custom_fields": {...}, ...}
+        """
+        self.add(**subscriber)
+
+    @staticmethod
+    def _move_tag(subscriber, tag, to_key, from_key):
+        if tag in subscriber.get(from_key, ()):
+            subscriber[from_key].remove(tag)
+            if not subscriber[from_key]:
+                del subscriber[from_key]
+        tags = subscriber.setdefault(to_key, [])
+        if tag not in tags:
+            tags.append(tag)
+
+    def payload(self):
+        """
+        Returns:
+            dict: {"batches": [{"subscribers": [{ ... }]}]}
+        """
+        return {"batches": [{"subscribers": list(self)}]}
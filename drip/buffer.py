@@ -0,0 +1,207 @@
+import atexit
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+from .helpers import build_event, email_key
+
+logger = logging.getLogger(__name__)
+
+
+class Buffer(object):
+    """
+    Base class of the buffers collecting calls in memory and sending them through a batches API
+    The buffer is flushed once it holds max_size items, every max_age seconds and on close.
+    Records of partitions Drip rejects or loses are kept and sent again, ahead of newer items, by the
+    next flush. At most max_retained of them are kept, the oldest are dropped and logged beyond that
+    """
+    def __init__(self, drip, max_size=1000, max_age=5.0, max_retained=None):
+        """
+        Args:
+            drip (DripPy): The client used to send the batches
+            max_size (int): Optional, number of buffered items that triggers a flush
+            max_age (float): Optional, seconds between background flushes, None to only flush on size and close
+            max_retained (int): Optional, max number of failed records kept for the next flush,
+                defaults to 10 times max_size
+        """
+        self.drip = drip
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_retained = max_retained if max_retained is not None else 10 * max_size
+        self._pending = self._new_pending()
+        self._retained = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        if max_age:
+            self._thread = threading.Thread(target=self._flush_periodically)
+            self._thread.daemon = True
+            self._thread.start()
+        atexit.register(_close_buffer, weakref.ref(self))
+
+    def __len__(self):
+        return len(self._pending) + len(self._retained)
+
+    @property
+    def retained(self):
+        """
+        int: Number of failed records waiting for the next flush
+        """
+        return len(self._retained)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _new_pending(self):
+        raise NotImplementedError
+
+    def _records(self, pending):
+        raise NotImplementedError
+
+    def _send(self, records):
+        raise NotImplementedError
+
+    def _flush_if_full(self):
+        if len(self._pending) >= self.max_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Sends the failed records kept by the previous flush and every buffered item, 1000 per request.
+        Records of the partitions that fail again are kept for the next flush
+        Returns:
+            BatchReport: The outcome of the sent batches, None when the buffer was empty
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, self._new_pending()
+            records, self._retained = self._retained + self._records(pending), []
+            if not records:
+                return
+            try:
+                report = self._send(records)
+            except Exception:
+                self._retain(records)
+                raise
+            self._retain([record for partition in report.failed for record in partition.records or ()])
+            return report
+
+    def _retain(self, records):
+        if not records:
+            return
+        dropped = len(records) - self.max_retained
+        if dropped > 0:
+            logger.error("Dropping {} failed records of {}, max_retained reached".format(dropped,
+                                                                                        type(self).__name__))
+            records = records[dropped:]
+        logger.warning("Keeping {} failed records of {} for the next flush".format(len(records),
+                                                                                   type(self).__name__))
+        self._retained = records
+
+    def close(self):
+        """
+        Stops the background flushes and sends the remaining items, records that still fail are logged
+        """
+        self._closed.set()
+        self.flush()
+        if self._retained:
+            logger.error("{} records of {} could not be sent before closing".format(len(self._retained),
+                                                                                  type(self).__name__))
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.max_age):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error while flushing {}. Error: {}".format(type(self).__name__, str(e)))
+
+
+class TagBuffer(Buffer):
+    """
+    Collects tag changes in memory and sends them through the subscribers batches API
+    Changes are merged per email whatever its case, an add and a remove of the same tag cancel each other out.
+    The buffer is flushed once it holds max_size emails, every max_age seconds and on close
+    """
+    def add_tag(self, email, tag):
+        """
+        Buffers adding a tag to an email
+        Args:
+            email (str): Email of the lead
+            tag (str): Tag to be added
+        """
+        self._change(email, tag, True)
+
+    def remove_tag(self, email, tag):
+        """
+        Buffers removing a tag from an email
+        Args:
+            email (str): Email of the lead
+            tag (str): Tag to be removed
+        """
+        self._change(email, tag, False)
+
+    def _new_pending(self):
+        return OrderedDict()
+
+    def _change(self, email, tag, add):
+        with self._lock:
+            key = email_key(email)
+            email, changes = self._pending.setdefault(key, (email, OrderedDict()))
+            if changes.get(tag, add) != add:
+                del changes[tag]
+                if not changes:
+                    del self._pending[key]
+            else:
+                changes[tag] = add
+        self._flush_if_full()
+
+    def _records(self, pending):
+        return [{
+            "email": email,
+            "tags": [tag for tag, add in changes.items() if add],
+            "remove_tags": [tag for tag, add in changes.items() if not add]
+        } for email, changes in pending.values()]
+
+    def _send(self, records):
+        return self.drip.update_subscribers(records)
+
+
+class EventBuffer(Buffer):
+    """
+    Collects custom events in memory and sends them through the events batches API
+    The buffer is flushed once it holds max_size events, every max_age seconds and on close
+    """
+    def record(self, email, action, properties=None, occurred_at=None, **attributes):
+        """
+        Buffers recording an event
+        Args:
+            email (str): Email of the lead
+            action (str): Name of the event, e.g. "Logged in"
+            properties (dict): Optional, properties of the event
+            occurred_at (datetime or str): Optional, when the event occurred, defaults to when Drip receives it
+            attributes: Optional, any other event attribute, e.g. prospect
+        """
+        event = build_event(email, action, properties, occurred_at, **attributes)
+        with self._lock:
+            self._pending.append(event)
+        self._flush_if_full()
+
+    def _new_pending(self):
+        return []
+
+    def _records(self, pending):
+        return pending
+
+    def _send(self, records):
+        return self.drip.record_events(records)
+
+
+def _close_buffer(buffer_ref):
+    buffer = buffer_ref()
+    if buffer is not None:
+        buffer.close()
@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class SubscriberCache(object):
+    """
+    Interface of the caches DripPy.fetch_subscriber reads through
+    Keys are subscriber IDs or emails, values are fetch_subscriber responses. Implement it
+    on top of a shared store to share cached subscribers between workers
+    """
+    def get(self, key):
+        """
+        Args:
+            key (str): Subscriber ID or email
+
+        Returns:
+            dict: The cached response, None when missing or expired
+        """
+        raise NotImplementedError
+
+    def get_many(self, keys):
+        """
+        Reads several keys at once, override it when the store can do so in one round trip
+        Args:
+            keys (list): Subscriber IDs or emails
+
+        Returns:
+            dict: The cached responses by key, missing and expired keys are left out
+        """
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set(self, key, value):
+        """
+        Args:
+            key (str): Subscriber ID or email
+            value (dict): The response to cache
+        """
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        """
+        Args:
+            keys (str): Subscriber IDs or emails to drop
+        """
+        raise NotImplementedError
+
+
+class LocalSubscriberCache(SubscriberCache):
+    """
+    A thread-safe in-process cache evicting the least recently used entries
+    """
+    def __init__(self, max_size=1024, ttl=300, clock=time.time):
+        """
+        Args:
+            max_size (int): Optional, max number of cached keys
+            ttl (float): Optional, seconds an entry stays valid
+            clock: Optional, callable returning the current time in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                return None
+            self._entries[key] = entry
+            return value
+
+    def get_many(self, keys):
+        values = {}
+        with self._lock:
+            now = self.clock()
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None and entry[0] > now:
+                    self._entries[key] = entry
+                    values[key] = entry[1]
+        return values
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock() + self.ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisSubscriberCache(SubscriberCache):
+    """
+    A cache shared between workers through Redis, entries expire after ttl seconds
+    """
+    def __init__(self, client, ttl=300, prefix='drip:subscriber:'):
+        """
+        Args:
+            client: A redis.StrictRedis compatible client
+            ttl (int): Optional, seconds an entry stays valid
+            prefix (str): Optional, prefix of the Redis keys
+        """
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return json.loads(value)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = {}
+        for key, value in zip(keys, self.client.mget([self.prefix + key for key in keys])):
+            if value is not None:
+                values[key] = json.loads(value.decode('utf-8') if isinstance(value, bytes) else value)
+        return values
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.ttl, json.dumps(value))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
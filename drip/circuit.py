@@ -0,0 +1,206 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitEvent(namedtuple('CircuitEvent', ['account_id', 'endpoint', 'old_state', 'new_state', 'failures',
+                                               'error_rate'])):
+    """
+    Describes a state change of one circuit
+        account_id (str): The account of the circuit
+        endpoint (str): The query path template of the circuit, e.g. :account_id/subscribers/batches
+        old_state (str): closed, open or half_open
+        new_state (str): closed, open or half_open
+        failures (int): Consecutive failures when the state changed
+        error_rate (float): Share of failed requests in the window when the state changed
+    """
+    __slots__ = ()
+
+
+class Circuit(object):
+    """
+    The state of one endpoint of one account, see CircuitBreaker
+    """
+    def __init__(self, window):
+        self.state = CLOSED
+        self.failures = 0
+        self.outcomes = deque(maxlen=window)
+        self.changed_at = None
+        self.probes = 0
+
+    @property
+    def error_rate(self):
+        """
+        float: Share of failed requests in the window, 0 when it is empty
+        """
+        if not self.outcomes:
+            return 0.0
+        return float(self.outcomes.count(False)) / len(self.outcomes)
+
+
+class CircuitBreaker(object):
+    """
+    Fails requests fast while an endpoint of an account keeps failing instead of waiting on timeouts
+    A circuit opens after failure_threshold consecutive failures, or once the error rate of the last window
+    requests reaches error_rate. Open circuits raise CircuitOpenError without sending the request. After
+    reset_timeout seconds the circuit is half open and lets half_open_probes requests through, it closes when
+    a probe succeeds and opens again when one fails. Exceptions and 5xx responses count as failures.
+    One breaker can be shared by every client of a process, circuits are kept per account and endpoint
+    """
+    def __init__(self, failure_threshold=5, error_rate=0.5, window=20, min_requests=10, reset_timeout=30.0,
+                 half_open_probes=1, listeners=None, clock=time.time):
+        """
+        Args:
+            failure_threshold (int): Optional, consecutive failures that open a circuit
+            error_rate (float): Optional, share of failed requests in the window that opens a circuit
+            window (int): Optional, number of latest requests the error rate is computed on
+            min_requests (int): Optional, requests needed in the window before the error rate is used
+            reset_timeout (float): Optional, seconds an open circuit waits before letting probes through
+            half_open_probes (int): Optional, max number of probes in flight while half open, probes that did not
+                complete within reset_timeout stop counting
+            listeners (list): Optional, callables taking a CircuitEvent, called on every state change
+            clock: Optional, callable returning the current time in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.window = window
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.listeners = list(listeners or [])
+        self.clock = clock
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        Args:
+            listener: Callable taking a CircuitEvent, called on every state change
+        """
+        self.listeners.append(listener)
+
+    def state(self, account_id, endpoint):
+        """
+        Args:
+            account_id (str): The account of the circuit
+            endpoint (str): The query path template of the circuit
+
+        Returns:
+            str: closed, open or half_open, open circuits whose reset_timeout has passed read as half_open
+        """
+        with self._lock:
+            circuit = self._circuits.get((account_id, endpoint))
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and self.clock() - circuit.changed_at >= self.reset_timeout:
+                return HALF_OPEN
+            return circuit.state
+
+    def states(self):
+        """
+        Returns:
+            dict: Maps (account_id, endpoint) to the state of every circuit that saw a request
+        """
+        with self._lock:
+            keys = list(self._circuits)
+        return dict((key, self.state(*key)) for key in keys)
+
+    def before_request(self, account_id, endpoint):
+        """
+        Lets a request through or fails it fast, every request let through must be followed by after_request
+        Args:
+            account_id (str): The account of the request
+            endpoint (str): The query path template of the request
+
+        Raises:
+            CircuitOpenError: When the circuit is open or all half open probes are in flight
+        """
+        events = []
+        try:
+            with self._lock:
+                circuit = self._circuits.get((account_id, endpoint))
+                if circuit is None:
+                    circuit = self._circuits[(account_id, endpoint)] = Circuit(self.window)
+                if circuit.state == OPEN:
+                    retry_after = circuit.changed_at + self.reset_timeout - self.clock()
+                    if retry_after > 0:
+                        raise CircuitOpenError(account_id, endpoint, retry_after)
+                    events.append(self._change(account_id, endpoint, circuit, HALF_OPEN))
+                if circuit.state == HALF_OPEN:
+                    if circuit.probes >= self.half_open_probes:
+                        if self.clock() - circuit.changed_at < self.reset_timeout:
+                            raise CircuitOpenError(account_id, endpoint, 0)
+                        # The probes never reported back, e.g. they were cancelled, let new ones through
+                        circuit.probes = 0
+                        circuit.changed_at = self.clock()
+                    circuit.probes += 1
+        finally:
+            self._emit(events)
+
+    def after_request(self, account_id, endpoint, status=None, error=None):
+        """
+        Records the outcome of a request let through by before_request
+        Args:
+            account_id (str): The account of the request
+            endpoint (str): The query path template of the request
+            status (int): Optional, the response status code, None when the request raised
+            error (Exception): Optional, the exception raised while sending the request
+        """
+        ok = error is None and status is not None and status < 500
+        events = []
+        with self._lock:
+            circuit = self._circuits.get((account_id, endpoint))
+            if circuit is None:
+                circuit = self._circuits[(account_id, endpoint)] = Circuit(self.window)
+            circuit.outcomes.append(ok)
+            circuit.failures = 0 if ok else circuit.failures + 1
+            if circuit.state == HALF_OPEN:
+                events.append(self._change(account_id, endpoint, circuit, CLOSED if ok else OPEN))
+            elif circuit.state == CLOSED and not ok and (
+                    circuit.failures >= self.failure_threshold or
+                    (len(circuit.outcomes) >= self.min_requests and circuit.error_rate >= self.error_rate)):
+                events.append(self._change(account_id, endpoint, circuit, OPEN))
+        self._emit(events)
+
+    def reset(self, account_id=None, endpoint=None):
+        """
+        Closes circuits and clears their counters
+        Args:
+            account_id (str): Optional, only reset the circuits of this account
+            endpoint (str): Optional, only reset the circuits of this query path template
+        """
+        with self._lock:
+            for key in list(self._circuits):
+                if account_id in (None, key[0]) and endpoint in (None, key[1]):
+                    del self._circuits[key]
+
+    def _change(self, account_id, endpoint, circuit, state):
+        event = CircuitEvent(account_id=account_id, endpoint=endpoint, old_state=circuit.state, new_state=state,
+                             failures=circuit.failures, error_rate=circuit.error_rate)
+        circuit.state = state
+        circuit.probes = 0
+        circuit.changed_at = self.clock()
+        if state == CLOSED:
+            circuit.failures = 0
+            circuit.outcomes.clear()
+        return event
+
+    def _emit(self, events):
+        for event in events:
+            log = logger.warning if event.new_state == OPEN else logger.info
+            log("Circuit {} of account {} is {}, was {}".format(event.endpoint, event.account_id, event.new_state,
+                                                                event.old_state))
+            for listener in self.listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    logger.error("Error while notifying circuit listener {}. Error: {}".format(listener, str(e)))
@@ -1,32 +1,141 @@
 import json
-import requests
 import logging
+import time
 
-from mixins import DripQueryPathMixin
+from .batch import SubscriberBatch
+from .buffer import EventBuffer, TagBuffer
+from .exceptions import DripError, DripResponseError
+from .helpers import (BackgroundCall, build_batch_payload, build_event, build_event_batch_payload,
+                      build_unsubscribe_batch_payload, chunks, iter_in_workers, partition_into_lanes, run_in_workers)
+from .metrics import RequestEvent, RequestMetrics
+from .mixins import DripQueryPathMixin
+from .models import LazyResponse, SubscriberResponse
+from .rate_limit import parse_retry_after
+from .report import BatchReport, PartitionResult
+from .serializers import encode_payload, is_gzipped
+from .transport import DEFAULT_TIMEOUT, RequestsTransport
 
 logger = logging.getLogger(__name__)
 
+RESPONSE_MODES = ("full", "status", "lazy")
+
 
 class DripPy(DripQueryPathMixin):
     """
     The main class that interacts with Drip
     https://www.getdrip.com/docs/rest-api#subscribers
     """
-    def __init__(self, token, account_id, endpoint='https://api.getdrip.com/v2/'):
+    def __init__(self, token, account_id, endpoint='https://api.getdrip.com/v2/', pool_connections=10,
+                 pool_maxsize=10, pool_block=False, timeout=DEFAULT_TIMEOUT, rate_limiter=None, retry_policy=None,
+                 serializer=json.dumps, compress_threshold=None, subscriber_cache=None, observers=None,
+                 transport=None, circuit_breaker=None):
         """
         Args:
             token: Drip generated token
             account_id: Drip generated account id
             endpoint: Optional, already set to 'https://api.getdrip.com/v2/'
+            pool_connections (int): Optional, number of per-host connection pools to keep
+            pool_maxsize (int): Optional, max number of keep-alive connections per host
+            pool_block (bool): Optional, block instead of opening extra connections once a host pool is full
+            timeout (float or tuple): Optional, timeout in seconds or a (connect, read) tuple for every request,
+                defaults to DEFAULT_TIMEOUT, None waits forever
+            rate_limiter (TokenBucket): Optional, budget every request waits on, can be shared between clients
+            retry_policy (RetryPolicy): Optional, retries failed requests based on their status code or exception
+            serializer: Optional, callable encoding payloads to JSON, see serializers.fastest_json_encoder
+            compress_threshold (int): Optional, gzip request bodies of at least this many bytes
+            subscriber_cache (SubscriberCache): Optional, cache fetch_subscriber reads through, entries are
+                invalidated by the writes made through this client
+            observers (list): Optional, RequestObserver hooks called around every request, request metrics
+                are always collected in self.metrics
+            transport (Transport): Optional, the HTTP stack requests are sent through, can be shared between
+                clients. Defaults to a RequestsTransport built from the pool options
+            circuit_breaker (CircuitBreaker): Optional, fails requests fast with CircuitOpenError while their
+                endpoint keeps failing, can be shared between clients
         """
         super(DripPy, self).__init__(token, account_id, endpoint)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.serializer = serializer
+        self.compress_threshold = compress_threshold
+        self.subscriber_cache = subscriber_cache
+        self.metrics = RequestMetrics()
+        self.observers = [self.metrics] + list(observers or [])
+        self.tag_buffer = None
+        self.event_buffer = None
+        self.transport = transport or RequestsTransport(pool_connections, pool_maxsize, pool_block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def session(self):
+        """
+        requests.Session: The keep-alive session of the default transport, None with other transports
+        """
+        return getattr(self.transport, 'session', None)
+
+    def close(self):
+        """
+        Flushes buffered tag changes and events and closes the pooled connections held by this client
+        """
+        if self.tag_buffer is not None:
+            self.tag_buffer.close()
+        if self.event_buffer is not None:
+            self.event_buffer.close()
+        self.transport.close()
+
+    def enable_tag_buffer(self, max_size=1000, max_age=5.0, max_retained=None):
+        """
+        Buffers add_subscriber_tag and remove_subscriber_tag calls and sends them in batches,
+        see TagBuffer
+        Args:
+            max_size (int): Optional, number of buffered emails that triggers a flush
+            max_age (float): Optional, seconds between background flushes, None to only flush on size and close
+            max_retained (int): Optional, max number of failed records kept for the next flush, see Buffer
+
+        Returns:
+            TagBuffer
+        """
+        if self.tag_buffer is None:
+            self.tag_buffer = TagBuffer(self, max_size=max_size, max_age=max_age, max_retained=max_retained)
+        return self.tag_buffer
+
+    def enable_event_buffer(self, max_size=1000, max_age=5.0, max_retained=None):
+        """
+        Buffers record_event calls and sends them in batches, see EventBuffer
+        Args:
+            max_size (int): Optional, number of buffered events that triggers a flush
+            max_age (float): Optional, seconds between background flushes, None to only flush on size and close
+            max_retained (int): Optional, max number of failed records kept for the next flush, see Buffer
+
+        Returns:
+            EventBuffer
+        """
+        if self.event_buffer is None:
+            self.event_buffer = EventBuffer(self, max_size=max_size, max_age=max_age, max_retained=max_retained)
+        return self.event_buffer
+
+    def flush(self):
+        """
+        Sends the tag changes and events buffered by enable_tag_buffer and enable_event_buffer right away
+        """
+        if self.tag_buffer is not None:
+            self.tag_buffer.flush()
+        if self.event_buffer is not None:
+            self.event_buffer.flush()
 
-    def fetch_subscriber(self, subscriber_id):
+    def fetch_subscriber(self, subscriber_id, typed=False):
         """
-        Fetches a subscriber from Drip
+        Fetches a subscriber from Drip, served from subscriber_cache when it holds the subscriber
         GET /:account_id/subscribers/:subscriber_id
         Args:
             subscriber_id (int): The subscriber ID
+            typed (bool): Optional, return a SubscriberResponse decoding the body on first access instead of dicts
 
         Returns:
             json:   {
@@ -34,104 +143,515 @@ class DripPy(DripQueryPathMixin):
                       "subscribers": [{ ... }]
                     }
         """
+        if self.subscriber_cache is not None:
+            cached = self.subscriber_cache.get(self.get_cache_key(subscriber_id))
+            if cached is not None:
+                return SubscriberResponse.from_dict(cached) if typed else cached
         url = self.get_fetch_subscriber_query_path(subscriber_id)
-        return self.send_request(url, method="GET")
+        if not typed:
+            response = self.send_request(url, method="GET")
+            self.cache_subscriber(subscriber_id, response)
+            return response
+        r = self.request(url, method="GET")
+        response = SubscriberResponse(r.content, r.status_code)
+        if r.status_code == 200 and self.subscriber_cache is not None:
+            self.cache_subscriber(subscriber_id, response.json())
+        return response
 
-    def unsubscribe_email(self, email):
+    def fetch_subscribers(self, subscriber_ids, workers=8, typed=False):
         """
-        Unsubscribe a lead from all campaigns
+        Fetches many subscribers at once, duplicate IDs are fetched once
         Args:
-            email (str): Email of the lead
+            subscriber_ids (iterable): Subscriber IDs or emails
+            workers (int): Optional, max number of requests in flight, keep pool_maxsize at least as large
+            typed (bool): Optional, see fetch_subscriber
 
         Returns:
             json:   {
-                      "links": { ... },
-                      "subscribers": [{ ... }]
+                      "subscribers": {subscriber_id: { ... }, ...},
+                      "errors": {subscriber_id: DripResponseError(...), ...}
                     }
         """
+        results = {"subscribers": {}, "errors": {}}
+        for subscriber_id, response, error in self.iter_fetch_subscribers(subscriber_ids, workers=workers,
+                                                                          typed=typed):
+            if error is None:
+                results["subscribers"][subscriber_id] = response
+            else:
+                results["errors"][subscriber_id] = error
+        return results
+
+    def iter_fetch_subscribers(self, subscriber_ids, workers=8, typed=False):
+        """
+        Fetches many subscribers at once and yields them as they arrive, duplicate IDs are fetched once
+        Args:
+            subscriber_ids (iterable): Subscriber IDs or emails
+            workers (int): Optional, max number of requests in flight, keep pool_maxsize at least as large
+            typed (bool): Optional, see fetch_subscriber
+
+        Returns:
+            Yields (subscriber_id, response, error) tuples in completion order, error is the exception
+            raised while fetching the subscriber or None
+        """
+        def unique(ids):
+            seen = set()
+            for subscriber_id in ids:
+                key = self.get_cache_key(subscriber_id)
+                if key not in seen:
+                    seen.add(key)
+                    yield subscriber_id
+
+        def fetch(subscriber_id):
+            if self.subscriber_cache is not None:
+                cached = self.subscriber_cache.get(self.get_cache_key(subscriber_id))
+                if cached is not None:
+                    return SubscriberResponse.from_dict(cached) if typed else cached
+            r = self.request(self.get_fetch_subscriber_query_path(subscriber_id), method="GET")
+            if r.status_code != 200:
+                raise DripResponseError(r.status_code, r.text)
+            if not typed:
+                response = r.json()
+                self.cache_subscriber(subscriber_id, response)
+                return response
+            response = SubscriberResponse(r.content, r.status_code)
+            if self.subscriber_cache is not None:
+                self.cache_subscriber(subscriber_id, response.json())
+            return response
+
+        return iter_in_workers(fetch, unique(subscriber_ids), workers)
+
+    def cache_subscriber(self, subscriber_id, response):
+        """
+        Stores a fetch_subscriber response in subscriber_cache under the requested key,
+        the subscriber ID and the email. Error responses are not cached
+        Args:
+            subscriber_id (str): The requested subscriber ID or email
+            response (dict): The fetch_subscriber response
+        """
+        if self.subscriber_cache is None or not isinstance(response, dict) or not response.get("subscribers"):
+            return
+        keys = set([self.get_cache_key(subscriber_id)])
+        for subscriber in response["subscribers"]:
+            keys.update(self.get_cache_key(subscriber[field]) for field in ("id", "email") if field in subscriber)
+        for key in keys:
+            self.subscriber_cache.set(key, response)
+
+    def iter_subscribers(self, status=None, tags=None, per_page=1000, prefetch=True, typed=False, **filters):
+        """
+        Iterates over every subscriber of the account, page by page. The next page is
+        fetched in the background while the current one is consumed
+        GET /:account_id/subscribers
+        Args:
+            status (str): Optional, active (Drip's default), all, unsubscribed, active_or_unsubscribed or undeliverable
+            tags (list): Optional, only subscribers with all of these tags
+            per_page (int): Optional, subscribers per page, 1000 at most
+            prefetch (bool): Optional, fetch page N + 1 while page N is consumed
+            typed (bool): Optional, yield compact Subscriber objects instead of dicts
+            filters: Optional, other query params, e.g. subscribed_after="2016-01-01T00:00:00Z"
+
+        Returns:
+            Yields subscriber dicts, or Subscriber objects when typed
+        """
+        url = self.get_list_subscribers_query_path()
+        params = dict(filters, per_page=per_page)
+        if status is not None:
+            params["status"] = status
+        if tags:
+            params["tags"] = tags if isinstance(tags, (bytes, type(u''))) else ",".join(tags)
+
+        def fetch_page(page):
+            if typed:
+                r = self.request(url, dict(params, page=page), method="GET")
+                if r.status_code != 200:
+                    raise DripError("Error while fetching page {} of subscribers".format(page))
+                response = SubscriberResponse(r.content, r.status_code)
+                return {"meta": response.meta, "subscribers": response.subscribers}
+            response = self.send_request(url, dict(params, page=page), method="GET")
+            if not isinstance(response, dict) or "subscribers" not in response:
+                raise DripError("Error while fetching page {} of subscribers".format(page))
+            return response
+
+        page = 1
+        response = fetch_page(page)
+        while True:
+            total_pages = response.get("meta", {}).get("total_pages", page)
+            next_page = None
+            if page < total_pages and prefetch:
+                next_page = BackgroundCall(fetch_page, page + 1)
+            for subscriber in response["subscribers"]:
+                yield subscriber
+            if page >= total_pages or not response["subscribers"]:
+                return
+            page += 1
+            response = next_page.result() if next_page is not None else fetch_page(page)
+
+    @staticmethod
+    def get_cache_key(subscriber_id):
+        """
+        Args:
+            subscriber_id (str): Subscriber ID or email
+
+        Returns:
+            str: The subscriber_cache key
+        """
+        if not isinstance(subscriber_id, (bytes, type(u''))):
+            subscriber_id = str(subscriber_id)
+        return subscriber_id.lower()
+
+    def invalidate_subscribers(self, emails):
+        """
+        Drops the cached responses of the given subscribers, along with the other keys they were cached under,
+        with one bulk read and one delete whatever the number of emails
+        Args:
+            emails (iterable): Subscriber emails or IDs
+        """
+        if self.subscriber_cache is None:
+            return
+        keys = set(self.get_cache_key(email) for email in emails)
+        if not keys:
+            return
+        for cached in self.subscriber_cache.get_many(list(keys)).values():
+            for subscriber in (cached or {}).get("subscribers", ()):
+                keys.update(self.get_cache_key(subscriber[field]) for field in ("id", "email") if field in subscriber)
+        self.subscriber_cache.delete(*keys)
+
+    def unsubscribe_email(self, email, response_mode="status"):
+        """
+        Unsubscribe a lead from all campaigns
+        Args:
+            email (str): Email of the lead
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
+
+        Returns:
+            int: The status code, see send_request for the other response modes
+        """
         url = self.get_unsubscribe_email_query_path(email)
-        self.send_request(url)
+        response = self.send_request(url, response_mode=response_mode)
+        self.invalidate_subscribers([email])
+        return response
+
+    def unsubscribe_emails(self, emails, workers=1, batcher=None):
+        """
+        Uses the unsubscribes batches API to unsubscribe any number of leads from all mailings,
+        1000 emails per request instead of one request per email
+        Args:
+            emails (iterable): List, generator or any iterable of emails, consumed lazily
+            workers (int): Optional, number of partitions uploaded in parallel
+            batcher (AdaptiveBatcher): Optional, see update_subscriber_tag_with_new_batch
 
-    def add_subscriber_tag(self, email, tag):
+        Returns:
+            BatchReport: Same as update_subscriber_tag_with_new_batch
+        """
+        url = self.get_unsubscribe_query_path_batches()
+        return self.send_batches(url, emails, build_unsubscribe_batch_payload, lambda email: email, workers=workers,
+                                 batcher=batcher)
+
+    def add_subscriber_tag(self, email, tag, response_mode="status"):
         """
         Uses post update API to add a given tag for an email, creates a new
-        subscriber if it doesn't exist in our list already
+        subscriber if it doesn't exist in our list already. Buffered once
+        enable_tag_buffer has been called
         Args:
             email (str): Email of the lead
             tag (str): Tag to be added
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
 
         Returns:
-            json:   {
-                      "links": { ... },
-                      "subscribers": [{ ... }]
-                    }
+            int: The status code, see send_request for the other response modes. None when buffered
         """
+        if self.tag_buffer is not None:
+            self.tag_buffer.add_tag(email, tag)
+            return
         url = self.get_update_subscriber_query_path()
-        self.send_request(url, {"subscribers": [{'email': email, 'tags': [tag]}]})
+        response = self.send_request(url, {"subscribers": [{'email': email, 'tags': [tag]}]},
+                                     response_mode=response_mode)
+        self.invalidate_subscribers([email])
+        return response
 
-    def remove_subscriber_tag(self, email, tag):
+    def remove_subscriber_tag(self, email, tag, response_mode="status"):
         """
         Uses post update API to add a given tag for an email, creates a new
-        subscriber if it doesn't exist in our list already.
+        subscriber if it doesn't exist in our list already. Buffered once
+        enable_tag_buffer has been called
         Args:
             email (str): Email of the lead
             tag (str): Tag to be added
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
 
         Returns:
-            json:   {
-                      "links": { ... },
-                      "subscribers": [{ ... }]
-                    }
+            int: The status code, see send_request for the other response modes. None when buffered
         """
+        if self.tag_buffer is not None:
+            self.tag_buffer.remove_tag(email, tag)
+            return
         url = self.get_update_subscriber_query_path()
-        self.send_request(url, {"subscribers": [{'email': email, 'remove_tags': [tag]}]})
+        response = self.send_request(url, {"subscribers": [{'email': email, 'remove_tags': [tag]}]},
+                                     response_mode=response_mode)
+        self.invalidate_subscribers([email])
+        return response
 
-    def update_subscriber_tag_with_new_batch(self, list_of_subscribers):
+    def update_subscriber_tag_with_new_batch(self, list_of_subscribers, workers=1, preserve_order=False, batcher=None):
         """
         Uses post update API to add a given tag for an email, creates a new
-        subscriber if it doesn't exist in our list already
+        subscriber if it doesn't exist in our list already. The input is consumed
+        lazily, one partition is built and sent at a time
         Args:
-            list_of_subscribers (list): List of subscribers
+            list_of_subscribers (iterable): List, generator or any iterable of (email, tag, remove_tag) subscribers
+            workers (int): Optional, number of partitions uploaded in parallel, also the max number of
+                requests in flight. Defaults to 1, sending partitions one after another
+            preserve_order (bool): Optional, with workers > 1 keeps the updates of an email in input order
+                by sending all of them from the same worker
+            batcher (AdaptiveBatcher): Optional, sizes partitions by latency, errors and encoded bytes
+                instead of sending 1000 subscribers per partition
         Returns:
-            json: {}
+            BatchReport: The status, latency, attempts and emails of every partition of 1000 subscribers,
+                failed partitions can be sent again with resend_failed
         """
         url = self.get_update_subscriber_query_path_batches()
-        from .helpers import partition
-        partitions = partition(list_of_subscribers, 1000)
-        for partition_list_of_subscriber in partitions:
-            payload = list()
-            for subscriber in partition_list_of_subscriber:
-                customer = dict()
-                customer["email"] = subscriber[0]
-                if subscriber[1] is not None:
-                    customer["tags"] = [subscriber[1]]
-                if subscriber[2] is not None:
-                    customer["remove_tags"] = [subscriber[2]]
-                payload.append(customer)
-            self.send_request(url, {"batches": [{"subscribers": payload}]})
-        return {}
-
-    def send_request(self, request_url, payload=None, method="POST"):
+        return self.send_batches(url, list_of_subscribers, build_batch_payload, lambda subscriber: subscriber[0],
+                                 workers=workers, preserve_order=preserve_order, batcher=batcher)
+
+    def update_subscribers(self, subscribers, workers=1, preserve_order=False, batcher=None):
+        """
+        Uses the batches API to create or update subscribers with any number of tags, removed tags,
+        custom fields and other attributes. Entries for the same email within a batch are merged so
+        that every subscriber is sent once per batch
+        Args:
+            subscribers (iterable): Iterable of subscriber dicts, e.g.
+                                    {
+                                      "email": "john@acme.com",
+                                      "tags": ["Customer", "SEO"],
+                                      "remove_tags": ["Prospect"],
+                                      "custom_fields": {"shirt_size": "Medium"}
+                                    }
+            workers (int): Optional, see update_subscriber_tag_with_new_batch
+            preserve_order (bool): Optional, see update_subscriber_tag_with_new_batch
+            batcher (AdaptiveBatcher): Optional, see update_subscriber_tag_with_new_batch
+        Returns:
+            BatchReport: Same as update_subscriber_tag_with_new_batch
+        """
+        url = self.get_update_subscriber_query_path_batches()
+        return self.send_batches(url, subscribers, lambda records: SubscriberBatch(records).payload(),
+                                 lambda subscriber: subscriber["email"], workers=workers,
+                                 preserve_order=preserve_order, batcher=batcher)
+
+    def record_event(self, email, action, properties=None, occurred_at=None, response_mode="status", **attributes):
+        """
+        Records a custom event for an email, creates a new subscriber if it doesn't exist in
+        our list already. Buffered once enable_event_buffer has been called
+        Args:
+            email (str): Email of the lead
+            action (str): Name of the event, e.g. "Logged in"
+            properties (dict): Optional, properties of the event
+            occurred_at (datetime or str): Optional, when the event occurred, defaults to when Drip receives it
+            response_mode (str): Optional, see send_request, defaults to status as the body is rarely needed
+            attributes: Optional, any other event attribute, e.g. prospect
+
+        Returns:
+            int: The status code, see send_request for the other response modes. None when buffered
+        """
+        if self.event_buffer is not None:
+            self.event_buffer.record(email, action, properties, occurred_at, **attributes)
+            return
+        url = self.get_record_event_query_path()
+        return self.send_request(url, {"events": [build_event(email, action, properties, occurred_at, **attributes)]},
+                                 response_mode=response_mode)
+
+    def record_events(self, events, workers=1, preserve_order=False, batcher=None):
+        """
+        Uses the events batches API to record any number of events, 1000 per request
+        Args:
+            events (iterable): Iterable of event dicts, e.g.
+                               {
+                                 "email": "john@acme.com",
+                                 "action": "Logged in",
+                                 "properties": {"affiliate_code": "XYZ"}
+                               }
+            workers (int): Optional, see update_subscriber_tag_with_new_batch
+            preserve_order (bool): Optional, see update_subscriber_tag_with_new_batch
+            batcher (AdaptiveBatcher): Optional, see update_subscriber_tag_with_new_batch
+        Returns:
+            BatchReport: Same as update_subscriber_tag_with_new_batch
+        """
+        url = self.get_record_event_query_path_batches()
+        return self.send_batches(url, events, build_event_batch_payload, lambda event: event["email"],
+                                 workers=workers, preserve_order=preserve_order, batcher=batcher)
+
+    def send_batches(self, request_url, records, build_payload, key, workers=1, preserve_order=False, batcher=None):
+        """
+        Partitions records in groups of 1000, or as sized by batcher, and posts a payload for each of them
+        Args:
+            request_url (str): The batches URL to post to
+            records (iterable): Records to send, consumed lazily
+            build_payload: Callable turning a list of records into a request payload
+            key: Callable returning the email of a record
+            workers (int): Optional, number of partitions uploaded in parallel
+            preserve_order (bool): Optional, with workers > 1 sends all records of an email from the same worker
+            batcher (AdaptiveBatcher): Optional, sizes the partitions and splits those Drip rejects as too large
+        Returns:
+            BatchReport: Same as update_subscriber_tag_with_new_batch
+        """
+        size = batcher.max_records if batcher is not None else 1000
+        if workers > 1 and preserve_order:
+            partitions = partition_into_lanes(records, size, workers, key=key)
+        elif batcher is not None:
+            partitions = ((None, partition_list) for partition_list in batcher.chunks(records))
+        else:
+            partitions = ((None, partition_list) for partition_list in chunks(records, size))
+        tasks = ((lane, (index, partition_list)) for index, (lane, partition_list) in enumerate(partitions))
+        return self.send_partitions(BatchReport(request_url, build_payload, key, batcher), tasks, workers,
+                                    ordered=preserve_order)
+
+    def resend_failed(self, report, workers=1):
+        """
+        Sends the failed partitions of a bulk update again, accepted partitions are not resent
+        Args:
+            report (BatchReport): The report returned by the bulk update
+            workers (int): Optional, number of partitions uploaded in parallel
+
+        Returns:
+            BatchReport: The outcome of the resent partitions, keeping their original index
+        """
+        tasks = ((None, (partition.index, partition.records)) for partition in report.failed)
+        return self.send_partitions(BatchReport(report.request_url, report.build_payload, report.key,
+                                                report.batcher), tasks, workers)
+
+    def send_partitions(self, report, tasks, workers=1, ordered=False):
+        """
+        Sends partitions and adds their outcome to a report
+        Args:
+            report (BatchReport): The report to fill, also holding the URL and payload builder
+            tasks (iterable): (lane, (index, records)) tuples
+            workers (int): Optional, number of partitions uploaded in parallel
+            ordered (bool): Optional, sends the partitions of a lane one after another from the same worker
+
+        Returns:
+            BatchReport: The report
+        """
+        def send(partition):
+            try:
+                if report.batcher is not None:
+                    return self.send_adaptive_partition(report, *partition)
+                return [self.send_partition(report, *partition)]
+            except Exception as e:
+                index, records = partition
+                logger.error("Error while sending partition {}. Error: {}".format(index, e))
+                return [PartitionResult(index=index, status=None, latency=0.0, attempts=0, emails=[], error=e,
+                                        records=records)]
+
+        if workers <= 1:
+            for lane, partition in tasks:
+                for result in send(partition):
+                    report.add(result)
+        else:
+            for results, error in run_in_workers(send, tasks, workers, ordered=ordered):
+                for result in results:
+                    report.add(result)
+        return report
+
+    def send_adaptive_partition(self, report, index, records):
+        """
+        Posts one partition in parts sized by report.batcher, parts over its byte limit and
+        parts Drip rejects as too large are split in halves and sent again
+        Args:
+            report (BatchReport): The report holding the URL, payload builder, email key and batcher
+            index (int): Position of the partition in the input
+            records (list): The records of the partition
+
+        Returns:
+            list: One PartitionResult per part sent, in input order
+        """
+        batcher = report.batcher
+        results = []
+        for chunk in chunks(records, batcher.limit):
+            try:
+                parts = batcher.encode(chunk, report.build_payload, self.encode_payload)
+            except Exception:
+                parts = [(chunk, None)]
+            for part, body in parts:
+                result = self.send_partition(report, index, part, body)
+                batcher.observe(len(part), result.latency / max(result.attempts, 1), result.status, result.error,
+                                len(body) if body is not None else None)
+                if result.status == 413 and len(part) > 1:
+                    middle = len(part) // 2
+                    results.extend(self.send_adaptive_partition(report, index, part[:middle]))
+                    results.extend(self.send_adaptive_partition(report, index, part[middle:]))
+                else:
+                    results.append(result)
+        return results
+
+    def send_partition(self, report, index, records, body=None):
+        """
+        Posts one partition, retrying it according to retry_policy, and invalidates its cached subscribers
+        Records without an email and payloads that cannot be built fail the partition, cache errors are only
+        logged as the result reports whether Drip accepted the partition
+        Args:
+            report (BatchReport): The report holding the URL, payload builder and email key
+            index (int): Position of the partition in the input
+            records (list): The records of the partition
+            body (str or bytes): Optional, the already encoded payload of the records
+
+        Returns:
+            PartitionResult
+        """
+        emails = []
+        attempts = []
+        status = error = None
+        start = time.time()
+        try:
+            emails = [report.key(record) for record in records]
+            if body is None:
+                body = self.encode_payload(report.build_payload(records))
+            status = self.retry(lambda attempt: attempts.append(attempt) or self.dispatch(
+                report.request_url, body, "POST", attempt)).status_code
+        except Exception as e:
+            error = e
+        try:
+            # Requests that raised may still have been applied by Drip
+            self.invalidate_subscribers(emails)
+        except Exception as e:
+            logger.error("Error while invalidating the cached subscribers of partition {}. Error: {}".format(
+                index, str(e)))
+        result = PartitionResult(index=index, status=status, latency=time.time() - start, attempts=len(attempts),
+                                 emails=emails, error=error, records=None)
+        if not result.ok:
+            logger.error("Error while sending partition {}. Status code: {}. Error: {}".format(index, status, error))
+            result = result._replace(records=records)
+        return result
+
+    def encode_payload(self, payload):
+        """
+        Encodes a payload the way send_request would, the result can be passed to
+        send_request any number of times without being encoded again
+        Args:
+            payload (dict): The payload to encode
+
+        Returns:
+            str or bytes: The request body
+        """
+        return encode_payload(payload, self.serializer, self.compress_threshold)
+
+    def send_request(self, request_url, payload=None, method="POST", response_mode="full"):
         """
         Dispatches the request and returns a response
         Args:
             request_url (str): The URL to request from
-            payload (dict): Optional
+            payload (dict or bytes): Optional, POST payloads can also be a body returned by encode_payload
             method (str): Defaults to POST, other option is GET
+            response_mode (str): Optional, full (default) decodes the JSON body, status skips decoding and
+                returns the status code, lazy returns a LazyResponse decoding the body when it is first read
 
         Returns:
-            json
+            json, the status code (int) or a LazyResponse depending on response_mode
         """
-        if not payload:
-            payload = {}
-        headers = {
-            'content-type': 'application/json',
-            'Accept': 'application/json'
-        }
-        if method == "POST":
-            r = requests.post(request_url, auth=(self.token, ''), headers=headers, data=json.dumps(payload))
-        else:
-            r = requests.get(request_url, auth=(self.token, ''), params=payload)
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError("Unknown response mode {}, expected one of {}".format(response_mode, RESPONSE_MODES))
+        r = self.request(request_url, payload, method)
+        if response_mode != "full":
+            if r.status_code not in (200, 202):
+                logger.error("Error while retrieving response. Status code: {}. Text: {}".format(r.status_code,
+                                                                                                 r.text))
+            return r.status_code if response_mode == "status" else LazyResponse(r.content, r.status_code)
         if r.status_code == 200:
             try:
                 return r.json()
@@ -143,3 +663,97 @@ class DripPy(DripQueryPathMixin):
         else:
             logger.error("Error while retrieving response. Status code: {}. Text: {}".format(r.status_code, r.text))
             return {}
+
+    def request(self, request_url, payload=None, method="POST"):
+        """
+        Sends the request, retrying it according to retry_policy, and returns the raw response
+        Args:
+            request_url (str): The URL to request from
+            payload (dict or bytes): Optional, POST payloads can also be a body returned by encode_payload
+            method (str): Defaults to POST, other option is GET
+
+        Returns:
+            requests.Response
+        """
+        if not payload:
+            payload = {}
+        if method == "POST":
+            payload = self.encode_payload(payload)
+        return self.retry(lambda attempt: self.dispatch(request_url, payload, method, attempt))
+
+    def retry(self, func):
+        """
+        Calls func according to retry_policy, once when there is no policy
+        Args:
+            func: Callable taking the attempt number, starting at 1, and returning a response
+
+        Returns:
+            The last response
+        """
+        if self.retry_policy is not None:
+            return self.retry_policy.call(func)
+        return func(1)
+
+    def dispatch(self, request_url, payload, method="POST", attempt=1):
+        """
+        Sends a single HTTP request once the circuit breaker and rate limiter allow it and reports it to the observers
+        Args:
+            request_url (str): The URL to request from
+            payload: Encoded body for POST, query params for GET
+            method (str): Defaults to POST, other option is GET
+            attempt (int): Optional, attempt number reported to the observers
+
+        Returns:
+            requests.Response
+
+        Raises:
+            CircuitOpenError: When the circuit of the endpoint is open, retry policies do not retry it
+        """
+        headers = {
+            'content-type': 'application/json',
+            'Accept': 'application/json'
+        }
+        if method == "POST" and is_gzipped(payload):
+            headers['Content-Encoding'] = 'gzip'
+        endpoint = self.get_query_path_template(request_url)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request(self.account_id, endpoint)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        self.notify_observers("before_request", method, endpoint, attempt)
+        start = time.time()
+        r = None
+        error = None
+        try:
+            if method == "POST":
+                r = self.transport.send(method, request_url, (self.token, ''), headers=headers, data=payload,
+                                        timeout=self.timeout)
+            else:
+                r = self.transport.send(method, request_url, (self.token, ''), params=payload, timeout=self.timeout)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.after_request(self.account_id, endpoint, r.status_code if r is not None else None,
+                                                   error)
+            self.notify_observers("after_request", RequestEvent(
+                method=method, endpoint=endpoint, status=r.status_code if r is not None else None,
+                latency=time.time() - start, request_bytes=len(payload) if method == "POST" else 0,
+                response_bytes=len(r.content or b'') if r is not None else 0, attempt=attempt, error=error))
+        if r.status_code == 429 and self.rate_limiter is not None:
+            self.rate_limiter.pause(parse_retry_after(r.headers.get('Retry-After')))
+        return r
+
+    def notify_observers(self, hook, *args):
+        """
+        Calls a hook on every observer, errors raised by observers are logged and ignored
+        Args:
+            hook (str): before_request or after_request
+            args: The hook arguments
+        """
+        for observer in self.observers:
+            try:
+                getattr(observer, hook)(*args)
+            except Exception as e:
+                logger.error("Error while notifying observer {}. Error: {}".format(observer, str(e)))
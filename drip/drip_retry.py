@@ -1,7 +1,88 @@
-from requests.exceptions import RequestException
-from retry import retry
+import random
+import time
 
-from drip import DripPy
+import requests
+
+from .drip import DripPy
+from .rate_limit import parse_retry_after
+
+
+class RetryPolicy(object):
+    """
+    Decides which requests are retried and how long to wait in between
+    Waits use exponential backoff with full jitter so that workers retrying at the
+    same time spread out instead of hitting Drip together, 429s wait at least Retry-After
+    """
+    def __init__(self, tries=3, delay=1, backoff=2, max_delay=30, deadline=60,
+                 retry_statuses=(429, 500, 502, 503, 504),
+                 retry_exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                                   requests.exceptions.ChunkedEncodingError),
+                 clock=time.time, sleep=time.sleep, random=random.random):
+        """
+        Args:
+            tries (int): Optional, max number of attempts
+            delay (float): Optional, upper bound of the first wait in seconds
+            backoff (float): Optional, multiplier of the upper bound after every attempt
+            max_delay (float): Optional, max upper bound of a single wait in seconds
+            deadline (float): Optional, no attempt is started once this many seconds have passed
+            retry_statuses (tuple): Optional, response status codes that are retried
+            retry_exceptions (tuple): Optional, exception types that are retried
+            clock: Optional, callable returning the current time in seconds
+            sleep: Optional, callable used to wait between attempts
+            random: Optional, callable returning a float in [0, 1)
+        """
+        self.tries = tries
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self.clock = clock
+        self.sleep = sleep
+        self.random = random
+
+    def get_delay(self, attempt, response=None):
+        """
+        Computes the wait before the next attempt
+        Args:
+            attempt (int): The attempt that just failed, starting at 1
+            response: Optional, the failed response
+
+        Returns:
+            float: Number of seconds to wait
+        """
+        delay = self.random() * min(self.max_delay, self.delay * self.backoff ** (attempt - 1))
+        if response is not None and response.status_code == 429:
+            delay = max(delay, parse_retry_after(response.headers.get('Retry-After'), default=0))
+        return delay
+
+    def call(self, func):
+        """
+        Calls func until it returns a response that should not be retried or the policy gives up
+        Args:
+            func: Callable taking the attempt number, starting at 1, and returning a response
+
+        Returns:
+            The last response, the last exception is raised if the final attempt raised
+        """
+        start = self.clock()
+        attempt = 1
+        while True:
+            try:
+                response = func(attempt)
+            except self.retry_exceptions:
+                delay = self.get_delay(attempt)
+                if attempt >= self.tries or self.clock() + delay - start > self.deadline:
+                    raise
+            else:
+                if response.status_code not in self.retry_statuses:
+                    return response
+                delay = self.get_delay(attempt, response)
+                if attempt >= self.tries or self.clock() + delay - start > self.deadline:
+                    return response
+            self.sleep(delay)
+            attempt += 1
 
 
 class DripPyRetry(object):
@@ -9,13 +90,27 @@ class DripPyRetry(object):
     A wrapper class that provides retry functionality to the DripPy main class
     We recommend using this over using DripPy directly
     """
-    def __init__(self, token, account_id, endpoint='https://api.getdrip.com/v2/'):
-        self.drip_py = DripPy(token, account_id, endpoint)
+    def __init__(self, token, account_id, endpoint='https://api.getdrip.com/v2/', retry_policy=None, **kwargs):
+        """
+        Args:
+            token: Drip generated token
+            account_id: Drip generated account id
+            endpoint: Optional, already set to 'https://api.getdrip.com/v2/'
+            retry_policy (RetryPolicy): Optional, defaults to 3 tries with jittered exponential backoff
+            kwargs: Optional, passed on to DripPy
+        """
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.drip_py = DripPy(token, account_id, endpoint, retry_policy=self.retry_policy, **kwargs)
 
-    def __getattr__(self, item):
-        func = self.drip_py.__getattribute__(item)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.drip_py.close()
 
-        @retry((RequestException, ), tries=3, delay=1, backoff=2)
-        def retry_func(*args, **kwargs):
-            return func(*args, **kwargs)
-        return retry_func
+    def __getattr__(self, item):
+        value = getattr(self.drip_py, item)
+        if callable(value):
+            # Retries happen per request inside DripPy, methods are looked up once and kept
+            self.__dict__[item] = value
+        return value
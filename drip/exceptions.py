@@ -0,0 +1,52 @@
+class DripError(Exception):
+    """
+    Raised when Drip could not complete a request
+    """
+    pass
+
+
+class DripResponseError(DripError):
+    """
+    Raised when Drip answers with an unexpected status code
+    """
+    def __init__(self, status_code, text=''):
+        """
+        Args:
+            status_code (int): The response status code
+            text (str): Optional, the response body
+        """
+        super(DripResponseError, self).__init__("Status code: {}. Text: {}".format(status_code, text))
+        self.status_code = status_code
+        self.text = text
+
+
+class DripBatchError(DripError):
+    """
+    Raised when Drip rejects or loses partitions of a bulk update
+    """
+    def __init__(self, report):
+        """
+        Args:
+            report (BatchReport): The report of the bulk update
+        """
+        super(DripBatchError, self).__init__("Failed partitions: {}".format(
+            ", ".join(str(partition.index) for partition in report.failed)))
+        self.report = report
+
+
+class CircuitOpenError(DripError):
+    """
+    Raised without sending the request while the circuit of an endpoint is open, see CircuitBreaker
+    """
+    def __init__(self, account_id, endpoint, retry_after):
+        """
+        Args:
+            account_id (str): The account of the request
+            endpoint (str): The query path template of the request
+            retry_after (float): Seconds until the circuit lets a probe through
+        """
+        super(CircuitOpenError, self).__init__("Circuit open for {} of account {}, retry in {:.1f}s".format(
+            endpoint, account_id, retry_after))
+        self.account_id = account_id
+        self.endpoint = endpoint
+        self.retry_after = retry_after
@@ -1,16 +1,334 @@
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import islice
+
+try:
+    from queue import Empty, Full, Queue
+except ImportError:  # pragma: no cover
+    from Queue import Empty, Full, Queue
+
+_STOP = object()
+
+
 def chunks(lst, n):
     """
-    Yields successive n-sized chunks from list
+    Yields successive n-sized chunks from any iterable, consuming it lazily so that
+    only one chunk is held in memory at a time
     Args:
-        lst: Python List
+        lst: Python List, generator or any other iterable
         n (int): Size of chunks
 
     Returns:
-        Yields successive n-sized chunks
+        Yields successive n-sized lists
     """
-    for i in xrange(0, len(lst), n):
-        yield lst[i:i + n]
+    iterator = iter(lst)
+    while True:
+        chunk = list(islice(iterator, n))
+        if not chunk:
+            return
+        yield chunk
 
 
 def partition(lst, n):
+    """
+    Splits an iterable into a list of n-sized lists, prefer chunks to avoid holding every partition in memory
+    Args:
+        lst: Python List, generator or any other iterable
+        n (int): Size of chunks
+
+    Returns:
+        list: List of n-sized lists
+    """
     return list(chunks(lst, n))
+
+
+def build_subscriber_tag_payload(subscriber):
+    """
+    Builds the subscriber payload for a single batch entry
+    Args:
+        subscriber (tuple): (email, tag, remove_tag), tag and remove_tag can be None
+
+    Returns:
+        dict: The subscriber entry expected by the batches API
+    """
+    customer = dict()
+    customer["email"] = subscriber[0]
+    if subscriber[1] is not None:
+        customer["tags"] = [subscriber[1]]
+    if subscriber[2] is not None:
+        customer["remove_tags"] = [subscriber[2]]
+    return customer
+
+
+def build_batch_payload(list_of_subscribers):
+    """
+    Builds the batches API payload for one partition of subscribers
+    Args:
+        list_of_subscribers (list): List of (email, tag, remove_tag) subscribers
+
+    Returns:
+        dict: {"batches": [{"subscribers": [{ ... }]}]}
+    """
+    return {"batches": [{"subscribers": [build_subscriber_tag_payload(subscriber)
+                                         for subscriber in list_of_subscribers]}]}
+
+
+def email_key(email):
+    """
+    Args:
+        email (str): Email of the lead
+
+    Returns:
+        str: The key changes to the email are merged under, emails differing only by case are the same lead
+            as in email_lane and the subscriber cache
+    """
+    if isinstance(email, (bytes, type(u''))):
+        return email.lower()
+    return email
+
+
+def build_unsubscribe_batch_payload(emails):
+    """
+    Builds the unsubscribes batches API payload for one partition of emails
+    Args:
+        emails (list): Emails to unsubscribe, duplicates are sent once whatever their case
+
+    Returns:
+        dict: {"batches": [{"subscribers": [{"email": ...}]}]}
+    """
+    unique = OrderedDict()
+    for email in emails:
+        unique.setdefault(email_key(email), email)
+    return {"batches": [{"subscribers": [{"email": email} for email in unique.values()]}]}
+
+
+def build_event(email, action, properties=None, occurred_at=None, **attributes):
+    """
+    Builds an event of the events API
+    Args:
+        email (str): Email of the lead
+        action (str): Name of the event
+        properties (dict): Optional, properties of the event
+        occurred_at (datetime or str): Optional, when the event occurred
+        attributes: Optional, any other event attribute
+
+    Returns:
+        dict: {"email": ..., "action": ..., "properties": { ... }, "occurred_at": "2017-01-01T12:00:00Z"}
+    """
+    event = {"email": email, "action": action}
+    if properties:
+        event["properties"] = properties
+    if occurred_at is not None:
+        event["occurred_at"] = occurred_at if isinstance(occurred_at, (bytes, type(u''))) else occurred_at.isoformat()
+    event.update(attributes)
+    return event
+
+
+def build_event_batch_payload(events):
+    """
+    Builds the events batches API payload for one partition of events
+    Args:
+        events (list): Event dicts, see build_event
+
+    Returns:
+        dict: {"batches": [{"events": [{ ... }]}]}
+    """
+    return {"batches": [{"events": list(events)}]}
+
+
+def iter_in_workers(func, items, workers, backlog=2):
+    """
+    Calls func on every item using a bounded pool of worker threads and yields the outcomes as they complete
+    Args:
+        func: Callable taking a single item
+        items: Iterable of items, consumed lazily
+        workers (int): Number of worker threads
+        backlog (int): Optional, number of items queued per worker before the feeder waits
+
+    Returns:
+        Yields (item, result, error) tuples in completion order, error is the raised exception or None.
+        Closing the generator early, e.g. with break, stops the feeder and the workers once their current call
+        returns
+    """
+    tasks = Queue(maxsize=backlog * workers)
+    done = Queue()
+    closed = threading.Event()
+
+    def work():
+        while not closed.is_set():
+            try:
+                item = tasks.get(timeout=0.1)
+            except Empty:
+                continue
+            if item is _STOP:
+                break
+            try:
+                done.put((item, func(item), None))
+            except Exception as e:
+                done.put((item, None, e))
+        done.put(_STOP)
+
+    def put(item):
+        while not closed.is_set():
+            try:
+                tasks.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def feed():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        finally:
+            for _ in range(workers):
+                put(_STOP)
+
+    feeder = BackgroundCall(feed)
+    for _ in range(workers):
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+    try:
+        stopped = 0
+        while stopped < workers:
+            outcome = done.get()
+            if outcome is _STOP:
+                stopped += 1
+            else:
+                yield outcome
+        feeder.result()
+    finally:
+        closed.set()
+
+
+class BackgroundCall(object):
+    """
+    Calls a function in a daemon thread, result waits for it to finish
+    """
+    def __init__(self, func, *args, **kwargs):
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(func, args, kwargs))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, func, args, kwargs):
+        try:
+            self._result = func(*args, **kwargs)
+        except Exception as e:
+            self._error = e
+
+    def result(self):
+        """
+        Returns:
+            The value returned by the function, the exception it raised is raised again
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def email_lane(email, lanes):
+    """
+    Maps an email to one of `lanes` lanes, the same email always lands in the same lane
+    Args:
+        email (str): Email of the lead
+        lanes (int): Number of lanes
+
+    Returns:
+        int: The lane index
+    """
+    if not isinstance(email, bytes):
+        email = email.encode('utf-8')
+    return (zlib.crc32(email.lower()) & 0xffffffff) % lanes
+
+
+def partition_into_lanes(lst, n, lanes, key):
+    """
+    Splits items into lanes by the email returned by key and yields n-sized chunks of each lane
+    Args:
+        lst: Iterable of items
+        n (int): Size of chunks
+        lanes (int): Number of lanes
+        key: Callable returning the email of an item
+
+    Returns:
+        Yields (lane, chunk) tuples, chunks of a lane are yielded in input order. Items without a usable email
+        are gathered in chunks of their own in lane 0, so that only they fail when their chunk is sent
+    """
+    buffers = [list() for _ in range(lanes)]
+    invalid = []
+    for item in lst:
+        try:
+            lane = email_lane(key(item), lanes)
+        except Exception:
+            invalid.append(item)
+            if len(invalid) == n:
+                yield 0, invalid
+                invalid = []
+            continue
+        buffers[lane].append(item)
+        if len(buffers[lane]) == n:
+            yield lane, buffers[lane]
+            buffers[lane] = list()
+    for lane, buffer in enumerate(buffers):
+        if buffer:
+            yield lane, buffer
+    if invalid:
+        yield 0, invalid
+
+
+def run_in_workers(func, tasks, workers, ordered=False, backlog=2):
+    """
+    Calls func on every task item using a bounded pool of worker threads
+    Args:
+        func: Callable taking a single task item
+        tasks: Iterable of (lane, item) tuples
+        workers (int): Number of worker threads
+        ordered (bool): Optional, items of the same lane are handled one after another by the same worker,
+            lanes must be lower than workers
+        backlog (int): Optional, number of items queued per worker before the producer waits
+
+    Returns:
+        list: (result, error) tuples in task order, error is the raised exception or None
+    """
+    if ordered:
+        queues = [Queue(maxsize=backlog) for _ in range(workers)]
+    else:
+        queues = [Queue(maxsize=backlog * workers)] * workers
+    outcomes = dict()
+    lock = threading.Lock()
+
+    def work(queue):
+        while True:
+            task = queue.get()
+            if task is _STOP:
+                return
+            index, item = task
+            try:
+                outcome = (func(item), None)
+            except Exception as e:
+                outcome = (None, e)
+            with lock:
+                outcomes[index] = outcome
+
+    threads = [threading.Thread(target=work, args=(queue, )) for queue in queues]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    count = 0
+    try:
+        for lane, item in tasks:
+            queues[lane if ordered else 0].put((count, item))
+            count += 1
+    finally:
+        for queue in queues:
+            queue.put(_STOP)
+        for thread in threads:
+            thread.join()
+    return [outcomes[index] for index in range(count)]
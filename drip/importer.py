@@ -0,0 +1,216 @@
+import codecs
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+
+from .exceptions import DripBatchError
+
+logger = logging.getLogger(__name__)
+
+
+def parse_csv_line(line):
+    """
+    Args:
+        line (bytes): One CSV line, UTF-8 encoded
+
+    Returns:
+        list: The cells of the line
+    """
+    if str is bytes:
+        return [cell.decode('utf-8') for cell in next(csv.reader([line]))]
+    return next(csv.reader([line.decode('utf-8')]))
+
+
+def write_checkpoint(path, checkpoint):
+    """
+    Writes a checkpoint atomically, a crash leaves either the previous or the new checkpoint
+    Args:
+        path (str): The checkpoint file
+        checkpoint (dict): The checkpoint to save as JSON
+    """
+    temp_path = "{}.tmp".format(path)
+    with open(temp_path, 'w') as temp_file:
+        json.dump(checkpoint, temp_file)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    getattr(os, 'replace', os.rename)(temp_path, path)
+
+
+def read_checkpoint(path):
+    """
+    Args:
+        path (str): The checkpoint file
+
+    Returns:
+        dict: The saved checkpoint, None when there is none
+    """
+    try:
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+    except IOError:
+        return None
+
+
+def file_identity(path, head_size=64 * 1024):
+    """
+    Identifies the content of a file without reading all of it
+    Args:
+        path (str): The file
+        head_size (int): Optional, number of leading bytes hashed
+
+    Returns:
+        dict: {"size": 2048, "mtime": 1500000000.0, "head": "<sha1 of the leading bytes>"}
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as input_file:
+        head = hashlib.sha1(input_file.read(head_size)).hexdigest()
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "head": head}
+
+
+class BulkImporter(object):
+    """
+    Streams subscriber changes from a CSV or JSONL file into subscriber batches, saving the
+    byte offset of the input after every batch Drip acknowledged. Running it again after a
+    crash resumes from the last checkpoint instead of starting over
+
+    CSV files need a header with an email column, tags and remove_tags columns hold tags
+    separated by tag_separator and every other non-empty column is sent as a custom field.
+    JSONL files hold one subscriber dict per line, as accepted by DripPy.update_subscribers.
+    Records can't span lines. Lines that can't be parsed or have no email are skipped, logged and
+    their byte offsets collected in invalid_rows
+    """
+    def __init__(self, drip, path, checkpoint_path=None, file_format=None, batch_size=1000, tag_separator=";",
+                 buffer_size=1024 * 1024):
+        """
+        Args:
+            drip (DripPy): The client sending the batches
+            path (str): The CSV or JSONL file to import
+            checkpoint_path (str): Optional, defaults to the input path followed by .checkpoint
+            file_format (str): Optional, csv or jsonl, guessed from the file extension by default
+            batch_size (int): Optional, records per batch, at most 1000
+            tag_separator (str): Optional, separator of the tags in a CSV cell
+            buffer_size (int): Optional, bytes read from the file at a time
+        """
+        self.drip = drip
+        self.path = path
+        self.checkpoint_path = checkpoint_path or "{}.checkpoint".format(path)
+        self.file_format = file_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        self.batch_size = min(batch_size, 1000)
+        self.tag_separator = tag_separator
+        self.buffer_size = buffer_size
+        self.invalid_rows = []
+
+    def run(self):
+        """
+        Imports the file from the last checkpoint, the checkpoint is removed once the whole file is imported
+        and ignored when the size, modification time or leading bytes of the file changed since it was saved
+        Returns:
+            dict: {"records": 2500, "batches": 3, "resumed_from": 0, "invalid": 1}, records and batches
+                  include the batches sent before resuming, invalid counts the rows skipped by this run
+
+        Raises:
+            DripBatchError: When Drip rejects a batch, running again resends it
+        """
+        identity = file_identity(self.path)
+        checkpoint = read_checkpoint(self.checkpoint_path)
+        if checkpoint is not None and any(checkpoint.get(name) != value for name, value in identity.items()):
+            logger.warning("Ignoring checkpoint {} saved for a different file".format(self.checkpoint_path))
+            checkpoint = None
+        if checkpoint is None:
+            checkpoint = dict(identity, offset=0, records=0, batches=0)
+        resumed_from = checkpoint["offset"]
+        if resumed_from:
+            logger.info("Resuming import of {} from byte {}".format(self.path, resumed_from))
+        self.invalid_rows = []
+        batch = []
+        for record, offset in self.iter_records(resumed_from):
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self.send_batch(batch, offset, checkpoint)
+                batch = []
+        if batch:
+            self.send_batch(batch, offset, checkpoint)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return {"records": checkpoint["records"], "batches": checkpoint["batches"], "resumed_from": resumed_from,
+                "invalid": len(self.invalid_rows)}
+
+    def send_batch(self, batch, offset, checkpoint):
+        """
+        Sends a batch and saves a checkpoint pointing right after its last record once Drip acknowledged it
+        Args:
+            batch (list): Subscriber dicts
+            offset (int): Byte offset following the last record of the batch
+            checkpoint (dict): The checkpoint to update
+        """
+        report = self.drip.update_subscribers(batch)
+        if not report.ok:
+            raise DripBatchError(report)
+        checkpoint["offset"] = offset
+        checkpoint["records"] += len(batch)
+        checkpoint["batches"] += 1
+        write_checkpoint(self.checkpoint_path, checkpoint)
+
+    def iter_records(self, offset=0):
+        """
+        Reads the file from a byte offset
+        Args:
+            offset (int): Optional, byte offset of the first line to read
+
+        Returns:
+            generator: (subscriber dict, byte offset following the record) tuples, blank lines are skipped,
+                invalid ones are skipped and their byte offset is added to invalid_rows
+        """
+        with io.open(self.path, 'rb', buffering=self.buffer_size) as input_file:
+            header = None
+            if self.file_format == "csv":
+                first_line = input_file.readline()
+                header = parse_csv_line(first_line[len(codecs.BOM_UTF8):] if first_line.startswith(
+                    codecs.BOM_UTF8) else first_line)
+                offset = max(offset, len(first_line))
+            input_file.seek(offset)
+            for line in input_file:
+                start = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                reason = "no email"
+                try:
+                    if header is None:
+                        record = json.loads(line.decode('utf-8'))
+                    else:
+                        record = self.parse_csv_record(header, parse_csv_line(line))
+                except (ValueError, csv.Error) as e:
+                    record, reason = None, str(e)
+                if not isinstance(record, dict) or not record.get("email"):
+                    logger.warning("Skipping invalid record at byte {} of {}: {}".format(start, self.path, reason))
+                    self.invalid_rows.append(start)
+                    continue
+                yield record, offset
+
+    def parse_csv_record(self, header, cells):
+        """
+        Args:
+            header (list): The column names
+            cells (list): The cells of a line
+
+        Returns:
+            dict: The subscriber dict
+        """
+        subscriber = {}
+        custom_fields = {}
+        for column, value in zip(header, cells):
+            if not value:
+                continue
+            if column == "email":
+                subscriber["email"] = value
+            elif column in ("tags", "remove_tags"):
+                subscriber[column] = [tag.strip() for tag in value.split(self.tag_separator) if tag.strip()]
+            else:
+                custom_fields[column] = value
+        if custom_fields:
+            subscriber["custom_fields"] = custom_fields
+        return subscriber
@@ -0,0 +1,136 @@
+import bisect
+import threading
+from collections import namedtuple
+
+
+class RequestEvent(namedtuple('RequestEvent', ['method', 'endpoint', 'status', 'latency', 'request_bytes',
+                                               'response_bytes', 'attempt', 'error'])):
+    """
+    Describes one HTTP request sent by DripPy
+        method (str): GET or POST
+        endpoint (str): The query path template, e.g. :account_id/subscribers/batches
+        status (int): The response status code, None when the request raised
+        latency (float): Seconds between sending the request and receiving the response
+        request_bytes (int): Size of the request body
+        response_bytes (int): Size of the response body
+        attempt (int): Attempt number, starting at 1, greater when the request is retried
+        error (Exception): The exception raised while sending the request, None otherwise
+    """
+    __slots__ = ()
+
+
+class RequestObserver(object):
+    """
+    Base class of the hooks DripPy calls around every request, override the methods you need
+    """
+    def before_request(self, method, endpoint, attempt):
+        """
+        Args:
+            method (str): GET or POST
+            endpoint (str): The query path template
+            attempt (int): Attempt number, starting at 1
+        """
+        pass
+
+    def after_request(self, event):
+        """
+        Args:
+            event (RequestEvent): The completed request
+        """
+        pass
+
+
+class RequestMetrics(RequestObserver):
+    """
+    Thread-safe in-memory counters and latency histograms, per endpoint and in total
+    """
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Args:
+            buckets (tuple): Optional, sorted upper bounds of the latency buckets in seconds, ending with inf
+        """
+        self.buckets = buckets
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _new_stats(self):
+        return {
+            "requests": 0,
+            "errors": 0,
+            "throttled": 0,
+            "retries": 0,
+            "request_bytes": 0,
+            "response_bytes": 0,
+            "latency_sum": 0.0,
+            "statuses": {},
+            "latency_histogram": [0] * len(self.buckets),
+        }
+
+    def after_request(self, event):
+        with self._lock:
+            for key in (event.endpoint, None):
+                stats = self._endpoints.get(key)
+                if stats is None:
+                    stats = self._endpoints[key] = self._new_stats()
+                stats["requests"] += 1
+                if event.error is not None or event.status >= 400:
+                    stats["errors"] += 1
+                if event.status == 429:
+                    stats["throttled"] += 1
+                if event.attempt > 1:
+                    stats["retries"] += 1
+                stats["request_bytes"] += event.request_bytes
+                stats["response_bytes"] += event.response_bytes
+                stats["latency_sum"] += event.latency
+                stats["statuses"][event.status] = stats["statuses"].get(event.status, 0) + 1
+                stats["latency_histogram"][bisect.bisect_left(self.buckets, event.latency)] += 1
+
+    def snapshot(self, endpoint=None):
+        """
+        Args:
+            endpoint (str): Optional, the query path template, all endpoints when None
+
+        Returns:
+            dict: Copy of the counters, statuses maps status codes (None for exceptions) to counts and
+                  latency_histogram counts requests per bucket of buckets
+        """
+        with self._lock:
+            stats = self._endpoints.get(endpoint) or self._new_stats()
+            return dict(stats, statuses=dict(stats["statuses"]), latency_histogram=list(stats["latency_histogram"]))
+
+    @property
+    def endpoints(self):
+        """
+        list: The query path templates requested so far
+        """
+        with self._lock:
+            return sorted(key for key in self._endpoints if key is not None)
+
+    def percentile(self, percent, endpoint=None):
+        """
+        Estimates a latency percentile from the histogram
+        Args:
+            percent (float): The percentile, e.g. 50 or 99
+            endpoint (str): Optional, the query path template, all endpoints when None
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, None when there were no requests
+        """
+        histogram = self.snapshot(endpoint)["latency_histogram"]
+        total = sum(histogram)
+        if not total:
+            return None
+        count = 0
+        for bound, bucket_count in zip(self.buckets, histogram):
+            count += bucket_count
+            if count >= total * percent / 100.0:
+                return bound
+
+    def reset(self):
+        """
+        Clears every counter
+        """
+        with self._lock:
+            self._endpoints = {}
@@ -2,6 +2,9 @@ class DripQueryPathMixin(object):
     """
     A mixin to help in generating the appropriate URLs for various Drip interactions
     """
+    # Path segments that are part of the API rather than IDs or emails
+    QUERY_PATH_SEGMENTS = ("subscribers", "batches", "remove", "events", "unsubscribes")
+
     def __init__(self, token, account_id, endpoint):
         """
         Here the arguments are set via DripPy main class
@@ -25,6 +28,14 @@ class DripQueryPathMixin(object):
         """
         return "{}{}/subscribers/{}".format(self.endpoint, self.account_id, subscriber_id)
 
+    def get_list_subscribers_query_path(self):
+        """
+        Generates API path for listing subscribers page by page
+        Returns:
+            str: The query path for listing subscribers
+        """
+        return "{}{}/subscribers".format(self.endpoint, self.account_id)
+
     def get_unsubscribe_email_query_path(self, email):
         """
         Generates API path for unsubscribing an email from all campaigns
@@ -51,3 +62,42 @@ class DripQueryPathMixin(object):
             str: The query path to create or update a batch of subscribers
         """
         return "{}{}/subscribers/batches".format(self.endpoint, self.account_id)
+
+    def get_unsubscribe_query_path_batches(self):
+        """
+        Generates API path for unsubscribing emails from all mailings in batches of 1000(max)
+        Returns:
+            str: The query path to unsubscribe a batch of emails
+        """
+        return "{}{}/unsubscribes/batches".format(self.endpoint, self.account_id)
+
+    def get_record_event_query_path(self):
+        """
+        Generates API path for recording events
+        Returns:
+            str: The query path to record an event
+        """
+        return "{}{}/events".format(self.endpoint, self.account_id)
+
+    def get_record_event_query_path_batches(self):
+        """
+        Generates API path for recording events in batches of 1000(max)
+        Returns:
+            str: The query path to record a batch of events
+        """
+        return "{}{}/events/batches".format(self.endpoint, self.account_id)
+
+    def get_query_path_template(self, request_url):
+        """
+        Generates the template of a query path, used to group requests by endpoint
+        Args:
+            request_url (str): A URL generated by this mixin
+
+        Returns:
+            str: e.g. ":account_id/subscribers/:id" for the fetch subscriber query path
+        """
+        path = request_url[len(self.endpoint):] if request_url.startswith(self.endpoint) else request_url
+        segments = path.split("/")
+        template = [":account_id" if i == 0 and segment == str(self.account_id) else
+                    segment if segment in self.QUERY_PATH_SEGMENTS else ":id" for i, segment in enumerate(segments)]
+        return "/".join(template)
@@ -0,0 +1,209 @@
+import json
+import logging
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+logger = logging.getLogger(__name__)
+
+_COMPACT = (',', ':')
+
+
+class Subscriber(object):
+    """
+    A compact subscriber, fields are kept in slots instead of one dict per subscriber
+    Nested fields hold the values decoded with the response, other fields Drip returns are kept in one dict
+    """
+    FIELDS = ("id", "email", "status", "first_name", "last_name", "time_zone", "utc_offset", "created_at",
+              "lead_score", "lifetime_value", "prospect", "user_id", "visitor_uuid", "href")
+    NESTED_FIELDS = ("custom_fields", "tags", "links")
+    __slots__ = FIELDS + NESTED_FIELDS + ("_extra", )
+
+    _KNOWN_FIELDS = frozenset(FIELDS + NESTED_FIELDS)
+
+    def __init__(self, data):
+        """
+        Args:
+            data (dict): A subscriber of a decoded Drip response
+        """
+        for name in self.FIELDS + self.NESTED_FIELDS:
+            setattr(self, name, data.get(name))
+        self._extra = dict((name, value) for name, value in data.items()
+                           if name not in self._KNOWN_FIELDS) or None
+
+    def __repr__(self):
+        return "Subscriber(id={!r}, email={!r})".format(self.id, self.email)
+
+    def __getitem__(self, name):
+        if name in self._KNOWN_FIELDS:
+            return getattr(self, name)
+        return (self._extra or {})[name]
+
+    def get(self, name, default=None):
+        """
+        Reads a field like dict.get, for code written against subscriber dicts
+        Args:
+            name (str): The field name
+            default: Optional, returned when the field is missing or null
+
+        Returns:
+            The field value
+        """
+        try:
+            value = self[name]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The subscriber as returned by Drip, without null fields
+        """
+        data = dict(self._extra or {})
+        for name in self.FIELDS + self.NESTED_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+
+class SubscriberResponse(object):
+    """
+    A subscribers response that keeps the raw body and only decodes it when it is read
+    The whole body is decoded at once on first read, then the decoded subscribers are turned into Subscribers
+    """
+    __slots__ = ("status_code", "content", "_subscribers", "_links", "_meta")
+
+    def __init__(self, content, status_code=200):
+        """
+        Args:
+            content (bytes): The response body
+            status_code (int): Optional, the response status code
+        """
+        self.status_code = status_code
+        self.content = content
+        self._subscribers = None
+        self._links = None
+        self._meta = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Args:
+            data (dict): A decoded response, e.g. one held by a SubscriberCache
+
+        Returns:
+            SubscriberResponse
+        """
+        return cls(json.dumps(data, separators=_COMPACT).encode('utf-8'))
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def __iter__(self):
+        return iter(self.subscribers)
+
+    def __repr__(self):
+        return "SubscriberResponse(status_code={}, bytes={})".format(self.status_code, len(self.content or b''))
+
+    def _decode(self):
+        data = self.json() if self.content else {}
+        if not isinstance(data, dict):
+            data = {}
+        self._subscribers = [Subscriber(subscriber) for subscriber in data.get("subscribers") or ()]
+        self._links = data.get("links") or {}
+        self._meta = data.get("meta") or {}
+
+    @property
+    def subscribers(self):
+        """
+        list: Subscriber objects, empty when the response holds no subscribers
+        """
+        if self._subscribers is None:
+            self._decode()
+        return self._subscribers
+
+    @property
+    def links(self):
+        """
+        dict: The links of the response
+        """
+        if self._subscribers is None:
+            self._decode()
+        return self._links
+
+    @property
+    def meta(self):
+        """
+        dict: Paging details of list responses, e.g. {"page": 1, "total_pages": 3}
+        """
+        if self._subscribers is None:
+            self._decode()
+        return self._meta
+
+    def json(self):
+        """
+        Returns:
+            dict: The whole response decoded as dicts, decoded again on every call
+        """
+        content = self.content
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return json.loads(content)
+
+
+class LazyResponse(Mapping):
+    """
+    A response body decoded as JSON when it is first read, it can be used like the dict
+    send_request returns by default. Like it, responses other than 200 read as {}
+    """
+    __slots__ = ("status_code", "content", "_data")
+
+    def __init__(self, content, status_code=200):
+        """
+        Args:
+            content (bytes): The response body
+            status_code (int): Optional, the response status code
+        """
+        self.status_code = status_code
+        self.content = content
+        self._data = None
+
+    @property
+    def data(self):
+        """
+        dict: The decoded body
+        """
+        if self._data is None:
+            self._data = {}
+            if self.status_code == 200 and self.content:
+                content = self.content
+                if isinstance(content, bytes):
+                    content = content.decode('utf-8')
+                try:
+                    self._data = json.loads(content)
+                except ValueError as e:
+                    logger.error("Error while retrieving response. Error: {}".format(str(e)))
+        return self._data
+
+    @property
+    def decoded(self):
+        """
+        bool: True once the body has been decoded
+        """
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return "LazyResponse(status_code={}, bytes={})".format(self.status_code, len(self.content or b''))
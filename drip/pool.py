@@ -0,0 +1,172 @@
+import threading
+import time
+
+from .drip import DripPy
+from .rate_limit import TokenBucket
+from .transport import RequestsTransport, Transport
+
+
+class AccountTransport(Transport):
+    """
+    Sends the requests of one account through a shared transport, at most max_in_flight at a time.
+    Extra requests wait in the account's own queue, so a busy account can't hold every pooled connection
+    """
+    def __init__(self, transport, max_in_flight=4):
+        """
+        Args:
+            transport (Transport): The transport shared by every account
+            max_in_flight (int): Optional, max number of requests of the account sent at the same time
+        """
+        self.transport = transport
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        requests.Session: The session of the shared transport, None with other transports
+        """
+        return getattr(self.transport, 'session', None)
+
+    def send(self, method, url, auth, headers=None, data=None, params=None, timeout=None):
+        with self._lock:
+            self.queued += 1
+        self._semaphore.acquire()
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+        try:
+            return self.transport.send(method, url, auth, headers=headers, data=data, params=params,
+                                       timeout=timeout)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._semaphore.release()
+
+    def close(self):
+        """
+        Leaves the shared transport open, DripClientPool.close closes it
+        """
+        pass
+
+
+class DripClientPool(object):
+    """
+    DripPy clients for many accounts sharing one connection pool. Every account gets its own
+    rate limit budget and request queue, so a bulk job on one account doesn't starve the others
+    """
+    def __init__(self, endpoint='https://api.getdrip.com/v2/', transport=None, pool_maxsize=10,
+                 requests_per_hour=3600, burst=None, max_in_flight=4, clock=time.time, **client_options):
+        """
+        Args:
+            endpoint: Optional, already set to 'https://api.getdrip.com/v2/'
+            transport (Transport): Optional, the transport shared by every account, defaults to a
+                RequestsTransport keeping up to pool_maxsize connections
+            pool_maxsize (int): Optional, max number of keep-alive connections of the default transport
+            requests_per_hour (int): Optional, default hourly budget of every account
+            burst (int): Optional, default burst of every account, see TokenBucket
+            max_in_flight (int): Optional, default max number of requests of an account sent at the same time
+            clock: Optional, callable returning the current time in seconds
+            client_options: Optional, passed on to every DripPy, e.g. retry_policy or timeout
+        """
+        self.endpoint = endpoint
+        self.transport = transport or RequestsTransport(pool_maxsize=pool_maxsize)
+        self.requests_per_hour = requests_per_hour
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.client_options = client_options
+        self._clients = {}
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, account_id):
+        return account_id in self._clients
+
+    def __getitem__(self, account_id):
+        return self._clients[account_id]
+
+    @property
+    def accounts(self):
+        """
+        list: The IDs of the accounts in the pool
+        """
+        with self._lock:
+            return sorted(self._clients)
+
+    def add_account(self, account_id, token, requests_per_hour=None, burst=None, max_in_flight=None):
+        """
+        Creates the client of an account, or returns it when the account is already in the pool
+        Args:
+            account_id: Drip generated account id
+            token: Drip generated token of the account
+            requests_per_hour (int): Optional, hourly budget of the account, defaults to the pool's
+            burst (int): Optional, burst of the account, defaults to the pool's
+            max_in_flight (int): Optional, max number of requests sent at the same time, defaults to the pool's
+
+        Returns:
+            DripPy
+        """
+        with self._lock:
+            client = self._clients.get(account_id)
+            if client is None:
+                rate_limiter = TokenBucket(requests_per_hour or self.requests_per_hour, burst or self.burst)
+                transport = AccountTransport(self.transport, max_in_flight or self.max_in_flight)
+                client = self._clients[account_id] = DripPy(token, account_id, self.endpoint, transport=transport,
+                                                            rate_limiter=rate_limiter, **self.client_options)
+                self._started[account_id] = self.clock()
+            return client
+
+    def remove_account(self, account_id):
+        """
+        Flushes and removes the client of an account
+        Args:
+            account_id: Drip generated account id
+        """
+        with self._lock:
+            client = self._clients.pop(account_id, None)
+            self._started.pop(account_id, None)
+        if client is not None:
+            client.close()
+
+    def stats(self, account_id=None):
+        """
+        Args:
+            account_id: Optional, the account to report on, every account when None
+
+        Returns:
+            dict: Request metrics snapshot of the account, see RequestMetrics.snapshot, with
+                  requests_per_second since the account was added and the current in_flight and
+                  queued requests. Keyed by account ID when account_id is None
+        """
+        if account_id is None:
+            return dict((account_id, self.stats(account_id)) for account_id in self.accounts)
+        client = self._clients[account_id]
+        stats = client.metrics.snapshot()
+        elapsed = self.clock() - self._started[account_id]
+        stats["requests_per_second"] = stats["requests"] / elapsed if elapsed > 0 else 0.0
+        stats["in_flight"] = client.transport.in_flight
+        stats["queued"] = client.transport.queued
+        return stats
+
+    def close(self):
+        """
+        Flushes the clients of every account and closes the shared transport
+        """
+        with self._lock:
+            clients, self._clients, self._started = list(self._clients.values()), {}, {}
+        for client in clients:
+            client.close()
+        self.transport.close()
@@ -0,0 +1,130 @@
+import multiprocessing
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+
+class TokenBucket(object):
+    """
+    A token bucket that keeps requests within Drip's hourly quota
+    https://www.getdrip.com/docs/rest-api#rate-limiting
+    One bucket can be shared by every thread of a process, create it with shared=True
+    to also share it with worker processes started after it
+    """
+    def __init__(self, requests_per_hour=3600, burst=None, shared=False, clock=time.time, sleep=time.sleep):
+        """
+        Args:
+            requests_per_hour (int): Optional, budget refilled every hour, defaults to Drip's 3600
+            burst (int): Optional, max number of requests sent back to back, defaults to a minute of budget
+            shared (bool): Optional, keep the state in shared memory so forked processes use the same budget
+            clock: Optional, callable returning the current time in seconds
+            sleep: Optional, callable used to wait for tokens
+        """
+        self.requests_per_hour = requests_per_hour
+        self.burst = burst or max(1, requests_per_hour // 60)
+        self.rate = requests_per_hour / 3600.0
+        self.clock = clock
+        self.sleep = sleep
+        # tokens, last refill time, paused until
+        state = [float(self.burst), clock(), 0.0]
+        if shared:
+            self._state = multiprocessing.Array('d', state, lock=False)
+            self._lock = multiprocessing.Lock()
+        else:
+            self._state = state
+            self._lock = threading.Lock()
+
+    def _refill(self, now):
+        refill_from = max(self._state[1], self._state[2])
+        if now > refill_from:
+            self._state[0] = min(float(self.burst), self._state[0] + (now - refill_from) * self.rate)
+            self._state[1] = now
+
+    def wait_time(self, tokens=1):
+        """
+        Seconds to wait before the given number of tokens can be acquired
+        Args:
+            tokens (int): Optional, number of requests
+
+        Returns:
+            float: 0 when the tokens are available right away
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            return self._wait_time(now, tokens)
+
+    def _wait_time(self, now, tokens):
+        return max(0.0, self._state[2] - now) + max(0.0, (tokens - self._state[0]) / self.rate)
+
+    @property
+    def remaining(self):
+        """
+        int: Number of requests that can be sent right away
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self._state[2]:
+                return 0
+            return int(self._state[0])
+
+    def acquire(self, tokens=1, block=True, timeout=None):
+        """
+        Takes tokens from the bucket, waiting for them to refill if needed
+        Args:
+            tokens (int): Optional, number of requests
+            block (bool): Optional, wait for the tokens instead of returning False right away
+            timeout (float): Optional, max number of seconds to wait
+
+        Returns:
+            bool: True if the tokens were acquired
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    self._state[0] -= tokens
+                    return True
+            if not block:
+                return False
+            if deadline is not None and now + wait > deadline:
+                return False
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stops handing out tokens for the given number of seconds, used when Drip answers 429
+        Args:
+            seconds (float): Number of seconds to pause for
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._state[2] = max(self._state[2], now + seconds)
+
+
+def parse_retry_after(value, default=60.0, clock=time.time):
+    """
+    Parses a Retry-After header
+    Args:
+        value (str): Delay in seconds or an HTTP date, can be None
+        default (float): Optional, returned when the header is missing or invalid
+        clock: Optional, callable returning the current time in seconds
+
+    Returns:
+        float: Number of seconds to wait
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return default
+    return max(0.0, mktime_tz(parsed) - clock())
@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+
+class PartitionResult(namedtuple('PartitionResult', ['index', 'status', 'latency', 'attempts', 'emails', 'error',
+                                                     'records'])):
+    """
+    Describes one partition sent by a bulk update
+        index (int): Position of the partition in the input, starting at 0. Parts of a partition split by an
+            AdaptiveBatcher share its index
+        status (int): The final response status code, None when the request raised
+        latency (float): Seconds spent sending the partition, retries included
+        attempts (int): Number of requests sent for the partition
+        emails (list): Emails of the records in the partition
+        error (Exception): The exception raised by the final attempt, None otherwise
+        records (list): The records of the partition, only kept when it failed so that it can be resent
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """
+        bool: True when Drip accepted the partition
+        """
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+
+class BatchReport(object):
+    """
+    The outcome of a bulk update, one PartitionResult per partition in input order
+    Pass it to DripPy.resend_failed to resend the failed partitions only
+    """
+    def __init__(self, request_url, build_payload, key, batcher=None):
+        """
+        Args:
+            request_url (str): The batches URL the partitions were posted to
+            build_payload: Callable turning a list of records into a request payload
+            key: Callable returning the email of a record
+            batcher (AdaptiveBatcher): Optional, sizes the partitions when set
+        """
+        self.request_url = request_url
+        self.build_payload = build_payload
+        self.key = key
+        self.batcher = batcher
+        self.partitions = []
+
+    def __len__(self):
+        return len(self.partitions)
+
+    def __iter__(self):
+        return iter(self.partitions)
+
+    def __repr__(self):
+        return "BatchReport(partitions={}, failed={})".format(len(self.partitions), len(self.failed))
+
+    def add(self, result):
+        """
+        Args:
+            result (PartitionResult): The outcome of the next partition
+        """
+        self.partitions.append(result)
+
+    @property
+    def ok(self):
+        """
+        bool: True when every partition was accepted
+        """
+        return all(partition.ok for partition in self.partitions)
+
+    @property
+    def succeeded(self):
+        """
+        list: The PartitionResults of the accepted partitions
+        """
+        return [partition for partition in self.partitions if partition.ok]
+
+    @property
+    def failed(self):
+        """
+        list: The PartitionResults of the rejected or lost partitions
+        """
+        return [partition for partition in self.partitions if not partition.ok]
+
+    @property
+    def failed_emails(self):
+        """
+        list: Emails of the records in failed partitions
+        """
+        return [email for partition in self.failed for email in partition.emails]
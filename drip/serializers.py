@@ -0,0 +1,70 @@
+import json
+import zlib
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def fastest_json_encoder():
+    """
+    Picks the fastest installed JSON encoder, falling back to the standard library
+    Tried in order: orjson, ujson, simplejson
+
+    Returns:
+        Callable turning a payload into str or bytes
+    """
+    for name in ('orjson', 'ujson', 'simplejson'):
+        try:
+            module = __import__(name)
+        except ImportError:
+            continue
+        return module.dumps
+    return json.dumps
+
+
+def gzip_compress(data, level=6):
+    """
+    Compresses data in the gzip format
+    Args:
+        data (bytes): Data to compress
+        level (int): Optional, compression level from 1 to 9
+
+    Returns:
+        bytes
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def is_gzipped(data):
+    """
+    Args:
+        data (str or bytes): A request body
+
+    Returns:
+        bool: True if data was compressed by gzip_compress
+    """
+    return isinstance(data, bytes) and data[:2] == GZIP_MAGIC
+
+
+def encode_payload(payload, serializer=json.dumps, compress_threshold=None, compress_level=6):
+    """
+    Encodes a request body, payloads that are already encoded are passed through so that
+    they can be built once and sent many times
+    Args:
+        payload (dict or str or bytes): Payload to encode, str and bytes are considered encoded
+        serializer: Optional, callable turning a payload into str or bytes
+        compress_threshold (int): Optional, gzip bodies of at least this many bytes
+        compress_level (int): Optional, gzip compression level from 1 to 9
+
+    Returns:
+        str or bytes: The request body
+    """
+    if isinstance(payload, (bytes, type(u''))):
+        data = payload
+    else:
+        data = serializer(payload)
+    if compress_threshold is not None and len(data) >= compress_threshold and not is_gzipped(data):
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        data = gzip_compress(data, compress_level)
+    return data
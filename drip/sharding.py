@@ -0,0 +1,188 @@
+import multiprocessing
+import pickle
+
+try:
+    from queue import Empty, Full
+except ImportError:  # pragma: no cover
+    from Queue import Empty, Full
+
+from .batch import SubscriberBatch
+from .drip import DripPy
+from .exceptions import DripError
+from .helpers import build_batch_payload, partition_into_lanes
+from .mixins import DripQueryPathMixin
+from .rate_limit import TokenBucket
+from .report import BatchReport
+
+
+def build_subscribers_payload(subscribers):
+    """
+    Builds the batches API payload for one partition of subscriber dicts, see DripPy.update_subscribers
+    """
+    return SubscriberBatch(subscribers).payload()
+
+
+def subscriber_tag_email(subscriber):
+    return subscriber[0]
+
+
+def subscriber_email(subscriber):
+    return subscriber["email"]
+
+
+class ShardedSync(DripQueryPathMixin):
+    """
+    Sends bulk updates from several worker processes, each with its own DripPy client and connection pool
+    Records are split into shards by a stable hash of their email, so every update of a subscriber is
+    sent by the same process in input order. All processes share one rate limit budget and the parent
+    merges their results into a single BatchReport
+    """
+    def __init__(self, token, account_id, endpoint='https://api.getdrip.com/v2/', shards=4, requests_per_hour=3600,
+                 burst=None, backlog=2, **client_options):
+        """
+        Args:
+            token: Drip generated token
+            account_id: Drip generated account id
+            endpoint: Optional, already set to 'https://api.getdrip.com/v2/'
+            shards (int): Optional, number of worker processes
+            requests_per_hour (int): Optional, hourly budget shared by every shard
+            burst (int): Optional, burst shared by every shard, see TokenBucket
+            backlog (int): Optional, partitions queued per shard before the parent waits
+            client_options: Optional, passed on to the DripPy of every shard, e.g. retry_policy or timeout
+        """
+        super(ShardedSync, self).__init__(token, account_id, endpoint)
+        self.shards = shards
+        self.backlog = backlog
+        self.rate_limiter = TokenBucket(requests_per_hour, burst, shared=True)
+        self.client_options = client_options
+        self.progress = {}
+
+    def update_subscriber_tag_with_new_batch(self, list_of_subscribers, on_progress=None):
+        """
+        Sharded counterpart of DripPy.update_subscriber_tag_with_new_batch
+        Args:
+            list_of_subscribers (iterable): List, generator or any iterable of (email, tag, remove_tag) subscribers
+            on_progress: Optional, callable taking (shard, PartitionResult), called as partitions complete
+
+        Returns:
+            BatchReport: The partitions of every shard, see send_batches
+        """
+        url = self.get_update_subscriber_query_path_batches()
+        return self.send_batches(url, list_of_subscribers, build_batch_payload, subscriber_tag_email,
+                                 on_progress=on_progress)
+
+    def update_subscribers(self, subscribers, on_progress=None):
+        """
+        Sharded counterpart of DripPy.update_subscribers
+        Args:
+            subscribers (iterable): Iterable of subscriber dicts
+            on_progress: Optional, callable taking (shard, PartitionResult), called as partitions complete
+
+        Returns:
+            BatchReport: The partitions of every shard, see send_batches
+        """
+        url = self.get_update_subscriber_query_path_batches()
+        return self.send_batches(url, subscribers, build_subscribers_payload, subscriber_email,
+                                 on_progress=on_progress)
+
+    def send_batches(self, request_url, records, build_payload, key, on_progress=None):
+        """
+        Splits records into shards by email and partitions of 1000, and sends them from the worker processes
+        Args:
+            request_url (str): The batches URL to post to
+            records (iterable): Records to send, consumed lazily
+            build_payload: Module level function turning a list of records into a request payload
+            key: Module level function returning the email of a record
+            on_progress: Optional, callable taking (shard, PartitionResult), called as partitions complete
+
+        Returns:
+            BatchReport: Partitions sorted by index, numbered in the order they were read from the input.
+                self.progress holds the partitions, records and failures counted per shard. Records without
+                an email fail partitions of their own instead of stopping the sync
+
+        Raises:
+            DripError: When a worker process dies
+        """
+        self.progress = dict((shard, {"partitions": 0, "records": 0, "failed": 0}) for shard in range(self.shards))
+        report = BatchReport(request_url, build_payload, key)
+        results = multiprocessing.Queue()
+        queues = [multiprocessing.Queue(maxsize=self.backlog) for _ in range(self.shards)]
+        processes = [multiprocessing.Process(target=_run_shard, args=(
+            shard, self.token, self.account_id, self.endpoint, self.rate_limiter, self.client_options, request_url,
+            build_payload, key, queues[shard], results)) for shard in range(self.shards)]
+        for process in processes:
+            process.daemon = True
+            process.start()
+        finished = set()
+
+        def collect(block):
+            while True:
+                try:
+                    shard, result = results.get(timeout=0.5) if block else results.get_nowait()
+                except Empty:
+                    if not block:
+                        return
+                    self._check_processes(processes, finished)
+                    continue
+                if result is None:
+                    finished.add(shard)
+                else:
+                    self.progress[shard]["partitions"] += 1
+                    self.progress[shard]["records"] += len(result.emails)
+                    self.progress[shard]["failed"] += 0 if result.ok else 1
+                    report.add(result)
+                    if on_progress is not None:
+                        on_progress(shard, result)
+                if block and len(finished) == len(processes):
+                    return
+
+        try:
+            tasks = partition_into_lanes(records, 1000, self.shards, key=key)
+            for index, (shard, partition_list) in enumerate(tasks):
+                self._put(queues[shard], (index, partition_list), processes, finished)
+                collect(block=False)
+            for shard in range(self.shards):
+                self._put(queues[shard], None, processes, finished)
+            collect(block=True)
+        finally:
+            for process in processes:
+                if process.is_alive() and len(finished) < len(processes):
+                    process.terminate()
+                process.join()
+        report.partitions.sort(key=lambda partition: partition.index)
+        return report
+
+    def _put(self, queue, item, processes, finished):
+        while True:
+            try:
+                queue.put(item, timeout=0.5)
+                return
+            except Full:
+                self._check_processes(processes, finished)
+
+    @staticmethod
+    def _check_processes(processes, finished):
+        for shard, process in enumerate(processes):
+            if shard not in finished and not process.is_alive() and process.exitcode != 0:
+                raise DripError("Shard {} exited with code {}".format(shard, process.exitcode))
+
+
+def _run_shard(shard, token, account_id, endpoint, rate_limiter, client_options, request_url, build_payload, key,
+               tasks, results):
+    drip = DripPy(token, account_id, endpoint, rate_limiter=rate_limiter, **client_options)
+    report = BatchReport(request_url, build_payload, key)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            index, partition_list = task
+            result = drip.send_partition(report, index, partition_list)
+            try:
+                pickle.dumps(result.error)
+            except Exception:
+                result = result._replace(error=DripError(repr(result.error)))
+            results.put((shard, result))
+    finally:
+        drip.close()
+        results.put((shard, None))
@@ -1 +1 @@
-from utils import *
+from .utils import *
@@ -0,0 +1,94 @@
+import json
+
+from drip.adaptive import AdaptiveBatcher
+from drip.tests import create_in_memory_drip_client
+
+
+def sent_emails(data):
+    return [subscriber["email"] for subscriber in json.loads(data)["batches"][0]["subscribers"]]
+
+
+def test_observe_grows_and_shrinks():
+    batcher = AdaptiveBatcher(max_records=100, min_records=10, initial_records=20, target_latency=1.0)
+    batcher.observe(20, 0.1, 201)
+    assert batcher.size == 30
+    batcher.observe(5, 0.1, 201)
+    assert batcher.size == 30
+    batcher.observe(30, 2.0, 201)
+    assert batcher.size == 15
+    batcher.observe(15, 0.1, 500)
+    assert batcher.size == 10
+    for _ in range(10):
+        batcher.observe(batcher.size, 0.1, 201)
+    assert batcher.size == 100
+    batcher.observe(100, 0.1, 413, body_size=5000)
+    assert batcher.size == 50
+    assert batcher.max_bytes == 4999
+
+
+def test_limit_caps_by_bytes():
+    batcher = AdaptiveBatcher(max_records=100, max_bytes=1000)
+    assert batcher.limit == 100
+    batcher.observe_bytes(10, 500)
+    assert batcher.limit == 20
+    assert [len(chunk) for chunk in batcher.chunks(range(50))] == [20, 20, 10]
+
+
+def test_encode_splits_oversized_partitions():
+    batcher = AdaptiveBatcher(max_bytes=50)
+    parts = batcher.encode(list(range(8)), lambda records: {"records": records}, json.dumps)
+    assert [records for records, body in parts] == [[0, 1, 2, 3, 4, 5, 6, 7]]
+    parts = batcher.encode(["x" * 10] * 8, lambda records: {"records": records}, json.dumps)
+    assert all(len(body) <= 50 for records, body in parts)
+    assert sum(len(records) for records, body in parts) == 8
+
+
+def test_update_subscriber_tag_with_new_batch_splits_on_413():
+    requests = []
+
+    def handler(method, url, headers, data, params):
+        requests.append((len(sent_emails(data)), len(data)))
+        return (413 if len(data) > 2000 else 201), {}, None
+
+    drip_client = create_in_memory_drip_client(handler)
+    subscribers = [("user{}@example.com".format(i), "tag", None) for i in range(200)]
+    batcher = AdaptiveBatcher(max_records=100, min_records=1)
+    report = drip_client.update_subscriber_tag_with_new_batch(subscribers, batcher=batcher)
+
+    assert report.ok
+    assert [email for partition in report for email in partition.emails] == [s[0] for s in subscribers]
+    assert [records for records, size in requests[:3]] == [100, 50, 25]
+    assert len([size for records, size in requests if size > 2000]) <= 3
+    assert batcher.max_bytes < requests[1][1]
+    assert all(partition.status == 201 for partition in report)
+
+
+def test_update_subscribers_caps_bytes():
+    requests = []
+
+    def handler(method, url, headers, data, params):
+        requests.append(len(data))
+        return 201, {}, None
+
+    drip_client = create_in_memory_drip_client(handler)
+    subscribers = [{"email": "user{}@example.com".format(i), "custom_fields": {"bio": "x" * 500}} for i in range(100)]
+    report = drip_client.update_subscribers(subscribers, batcher=AdaptiveBatcher(max_bytes=10000))
+
+    assert report.ok
+    assert len(requests) > 5
+    assert max(requests) <= 10000
+    assert sum(len(partition.emails) for partition in report) == 100
+
+
+def test_resend_failed_keeps_batcher():
+    statuses = [500, 201]
+
+    def handler(method, url, headers, data, params):
+        return statuses.pop(0) if statuses else 201, {}, None
+
+    drip_client = create_in_memory_drip_client(handler)
+    report = drip_client.unsubscribe_emails(["a@example.com", "b@example.com"], batcher=AdaptiveBatcher())
+    assert not report.ok
+    resent = drip_client.resend_failed(report)
+    assert resent.batcher is report.batcher
+    assert resent.ok
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from drip.aio import AsyncDripPy
+from drip.circuit import OPEN, CircuitBreaker
+from drip.exceptions import CircuitOpenError
+from drip.rate_limit import TokenBucket
+from drip.tests.test_drip import TestConstants
+
+logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+
+class FakeResponse(object):
+    def __init__(self, status=200, body=None, headers=None):
+        self.status = status
+        self.body = body or {}
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return json.dumps(self.body)
+
+    async def read(self):
+        return json.dumps(self.body).encode('utf-8')
+
+
+class FakeSession(object):
+    closed = False
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append(("POST", url, kwargs))
+        return self.response
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, kwargs))
+        return self.response
+
+    async def close(self):
+        self.closed = True
+
+
+def create_async_drip_client(**kwargs):
+    return AsyncDripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                       endpoint=TestConstants.test_endpoint, **kwargs)
+
+
+def test_async_fetch_subscriber():
+    drip_client = create_async_drip_client()
+    drip_client._session = FakeSession(FakeResponse(200, {"subscribers": [TestConstants.test_subscriber]}))
+    result = asyncio.run(drip_client.fetch_subscriber(TestConstants.test_subscriber_id))
+    assert result == {"subscribers": [TestConstants.test_subscriber]}
+    method, url, kwargs = drip_client._session.calls[0]
+    assert method == "GET"
+    assert url == drip_client.get_fetch_subscriber_query_path(TestConstants.test_subscriber_id)
+
+
+def test_async_add_subscriber_tag():
+    drip_client = create_async_drip_client()
+    drip_client._session = FakeSession(FakeResponse(202))
+    assert asyncio.run(drip_client.add_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)) == 202
+    method, url, kwargs = drip_client._session.calls[0]
+    assert url == drip_client.get_update_subscriber_query_path()
+    assert json.loads(kwargs["data"]) == {
+        "subscribers": [{'email': TestConstants.test_email, 'tags': [TestConstants.test_tag]}]}
+
+
+def test_async_send_request_error_response():
+    drip_client = create_async_drip_client()
+    drip_client._session = FakeSession(FakeResponse(500))
+    assert asyncio.run(drip_client.send_request(TestConstants.test_request_url)) == {}
+
+
+def test_async_send_request_lazy_response():
+    drip_client = create_async_drip_client()
+    drip_client._session = FakeSession(FakeResponse(200, {"subscribers": [TestConstants.test_subscriber]}))
+    result = asyncio.run(drip_client.send_request(TestConstants.test_request_url, response_mode="lazy"))
+    assert not result.decoded
+    assert result["subscribers"] == [TestConstants.test_subscriber]
+
+
+def test_async_send_request_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2)
+    drip_client = create_async_drip_client(circuit_breaker=breaker)
+    drip_client._session = FakeSession(FakeResponse(503))
+    for _ in range(2):
+        assert asyncio.run(drip_client.send_request(TestConstants.test_request_url, response_mode="status")) == 503
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(drip_client.send_request(TestConstants.test_request_url))
+    assert len(drip_client._session.calls) == 2
+    assert breaker.state(TestConstants.test_account_id, drip_client.get_query_path_template(
+        TestConstants.test_request_url)) == OPEN
+
+
+class SlowResponse(FakeResponse):
+    in_flight = 0
+    peak = 0
+
+    async def __aenter__(self):
+        SlowResponse.in_flight += 1
+        SlowResponse.peak = max(SlowResponse.peak, SlowResponse.in_flight)
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        SlowResponse.in_flight -= 1
+
+
+def test_async_send_request_rate_limited():
+    bucket = TokenBucket(requests_per_hour=3600, burst=1)
+    drip_client = create_async_drip_client(rate_limiter=bucket)
+    drip_client._session = FakeSession(FakeResponse(429, headers={'Retry-After': '30'}))
+    assert asyncio.run(drip_client.send_request(TestConstants.test_request_url)) == {}
+    assert bucket.remaining == 0
+    assert bucket.wait_time() > 29
+
+
+def test_async_update_subscriber_tag_with_new_batch_in_flight_limit():
+    drip_client = create_async_drip_client(max_in_flight=3)
+    drip_client._session = FakeSession(SlowResponse(202))
+    subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
+    report = asyncio.run(drip_client.update_subscriber_tag_with_new_batch([subscriber] * 10010))
+    assert report.ok
+    assert [partition.index for partition in report] == list(range(11))
+    assert len(drip_client._session.calls) == 11
+    assert SlowResponse.peak == 3
+
+
+def test_async_close():
+    drip_client = create_async_drip_client()
+    session = FakeSession(FakeResponse())
+    drip_client._session = session
+
+    async def use_client():
+        async with drip_client:
+            pass
+
+    asyncio.run(use_client())
+    assert session.closed
+
+
+def test_async_update_subscriber_tag_with_new_batch_generator():
+    drip_client = create_async_drip_client(max_in_flight=2)
+    drip_client._session = FakeSession(FakeResponse(202))
+    subscribers = ((TestConstants.test_email, TestConstants.test_tag, None) for _ in range(4500))
+    report = asyncio.run(drip_client.update_subscriber_tag_with_new_batch(subscribers))
+    assert [len(partition.emails) for partition in report] == [1000, 1000, 1000, 1000, 500]
+    assert len(drip_client._session.calls) == 5
+
+
+def test_async_update_subscribers():
+    drip_client = create_async_drip_client()
+    drip_client._session = FakeSession(FakeResponse(202))
+    subscribers = [{"email": TestConstants.test_email, "tags": [TestConstants.test_tag]},
+                   {"email": TestConstants.test_email, "custom_fields": {"size": "M"}}]
+    assert asyncio.run(drip_client.update_subscribers(subscribers)).ok
+    method, url, kwargs = drip_client._session.calls[0]
+    assert json.loads(kwargs["data"]) == {"batches": [{"subscribers": [
+        {"email": TestConstants.test_email, "tags": [TestConstants.test_tag], "custom_fields": {"size": "M"}}]}]}
+
+
+def test_async_update_subscribers_reports_failed_partitions():
+    drip_client = create_async_drip_client()
+    drip_client._session = FakeSession(FakeResponse(500))
+    subscribers = [{"email": TestConstants.test_email}, {"tags": [TestConstants.test_tag]}]
+    report = asyncio.run(drip_client.update_subscribers(subscribers))
+    assert not report.ok
+    assert isinstance(report.failed[0].error, KeyError)
+    assert report.failed[0].records == subscribers
+    report = asyncio.run(drip_client.update_subscribers(subscribers[:1]))
+    assert report.failed[0].status == 500
+    assert report.failed_emails == [TestConstants.test_email]
+
+
+def test_async_send_batches_cancels_pending_partitions():
+    cancelled = []
+
+    async def send_partition(report, index, records):
+        if index == 0:
+            raise ValueError("broken partition")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    drip_client = create_async_drip_client(max_in_flight=2)
+    drip_client.send_partition = send_partition
+    subscribers = [(TestConstants.test_email, TestConstants.test_tag, None)] * 3000
+
+    async def run():
+        with pytest.raises(ValueError):
+            await drip_client.update_subscriber_tag_with_new_batch(subscribers)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert cancelled == [1]
@@ -0,0 +1,34 @@
+from drip.batch import SubscriberBatch
+
+
+def test_subscriber_batch_merges_duplicate_emails():
+    batch = SubscriberBatch()
+    batch.add("a@example.com", tags=["one"], custom_fields={"size": "M"})
+    batch.add("b@example.com", tags=["one"])
+    batch.add("a@example.com", tags=["two", "one"], remove_tags=["three"], custom_fields={"color": "red"},
+              time_zone="UTC")
+    assert len(batch) == 2
+    assert batch.payload() == {"batches": [{"subscribers": [
+        {"email": "a@example.com", "tags": ["one", "two"], "remove_tags": ["three"],
+         "custom_fields": {"size": "M", "color": "red"}, "time_zone": "UTC"},
+        {"email": "b@example.com", "tags": ["one"]}]}]}
+
+
+def test_subscriber_batch_later_changes_win():
+    batch = SubscriberBatch()
+    batch.add("a@example.com", tags=["one"], custom_fields={"size": "M"}, time_zone="UTC")
+    batch.add("a@example.com", remove_tags=["one"], custom_fields={"size": "L"}, time_zone="EST")
+    assert list(batch) == [{"email": "a@example.com", "remove_tags": ["one"], "custom_fields": {"size": "L"},
+                            "time_zone": "EST"}]
+
+
+def test_subscriber_batch_from_dicts():
+    batch = SubscriberBatch([{"email": "a@example.com", "tags": ["one"]},
+                             {"email": "a@example.com", "tags": ["two"]}])
+    assert list(batch) == [{"email": "a@example.com", "tags": ["one", "two"]}]
+
+
+def test_subscriber_batch_merges_emails_ignoring_case():
+    batch = SubscriberBatch([{"email": "Foo@example.com", "tags": ["one"]},
+                             {"email": "foo@example.com", "tags": ["two"]}])
+    assert list(batch) == [{"email": "Foo@example.com", "tags": ["one", "two"]}]
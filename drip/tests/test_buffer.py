@@ -0,0 +1,142 @@
+import json
+import time
+
+from drip.buffer import EventBuffer, TagBuffer
+from drip.tests import create_in_memory_drip_client, sent_subscribers
+from drip.tests.test_drip import TestConstants
+
+
+def test_tag_buffer_merges_changes_per_email():
+    drip_client = create_in_memory_drip_client()
+    tag_buffer = TagBuffer(drip_client, max_age=None)
+    tag_buffer.add_tag("a@example.com", "one")
+    tag_buffer.add_tag("a@example.com", "two")
+    tag_buffer.remove_tag("a@example.com", "three")
+    tag_buffer.add_tag("b@example.com", "one")
+    assert len(tag_buffer) == 2
+    tag_buffer.flush()
+    assert drip_client.transport.requests[-1]["url"] == drip_client.get_update_subscriber_query_path_batches()
+    assert sent_subscribers(drip_client) == [
+        {"email": "a@example.com", "tags": ["one", "two"], "remove_tags": ["three"]},
+        {"email": "b@example.com", "tags": ["one"]}]
+    assert len(tag_buffer) == 0
+
+
+def test_tag_buffer_merges_emails_ignoring_case():
+    drip_client = create_in_memory_drip_client()
+    tag_buffer = TagBuffer(drip_client, max_age=None)
+    tag_buffer.add_tag("A@example.com", "one")
+    tag_buffer.add_tag("a@example.com", "two")
+    tag_buffer.remove_tag("a@example.com", "one")
+    assert len(tag_buffer) == 1
+    tag_buffer.flush()
+    assert sent_subscribers(drip_client) == [{"email": "A@example.com", "tags": ["two"]}]
+
+
+def test_tag_buffer_add_and_remove_cancel_out():
+    drip_client = create_in_memory_drip_client()
+    tag_buffer = TagBuffer(drip_client, max_age=None)
+    tag_buffer.add_tag(TestConstants.test_email, TestConstants.test_tag)
+    tag_buffer.remove_tag(TestConstants.test_email, TestConstants.test_tag)
+    assert len(tag_buffer) == 0
+    tag_buffer.flush()
+    assert not drip_client.transport.requests
+
+
+def test_tag_buffer_flushes_on_size():
+    drip_client = create_in_memory_drip_client()
+    tag_buffer = TagBuffer(drip_client, max_size=10, max_age=None)
+    for i in range(25):
+        tag_buffer.add_tag("{}@example.com".format(i), TestConstants.test_tag)
+    assert len(drip_client.transport.requests) == 2
+    assert len(tag_buffer) == 5
+
+
+def test_tag_buffer_flushes_on_age():
+    drip_client = create_in_memory_drip_client()
+    tag_buffer = TagBuffer(drip_client, max_age=0.01)
+    tag_buffer.add_tag(TestConstants.test_email, TestConstants.test_tag)
+    for _ in range(100):
+        if drip_client.transport.requests:
+            break
+        time.sleep(0.01)
+    tag_buffer.close()
+    assert sent_subscribers(drip_client) == [{"email": TestConstants.test_email, "tags": [TestConstants.test_tag]}]
+
+
+def test_tag_buffer_sends_1000_subscribers_per_request():
+    drip_client = create_in_memory_drip_client()
+    tag_buffer = TagBuffer(drip_client, max_size=5000, max_age=None)
+    for i in range(2500):
+        tag_buffer.add_tag("{}@example.com".format(i), TestConstants.test_tag)
+    tag_buffer.close()
+    assert len(drip_client.transport.requests) == 3
+
+
+def test_drip_client_buffers_tags():
+    drip_client = create_in_memory_drip_client()
+    drip_client.enable_tag_buffer(max_age=None)
+    drip_client.add_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)
+    drip_client.remove_subscriber_tag(TestConstants.test_email, TestConstants.test_remove_tag)
+    assert not drip_client.transport.requests
+    drip_client.close()
+    assert sent_subscribers(drip_client) == [{"email": TestConstants.test_email, "tags": [TestConstants.test_tag],
+                                              "remove_tags": [TestConstants.test_remove_tag]}]
+
+
+def test_event_buffer_flushes_on_size():
+    drip_client = create_in_memory_drip_client()
+    event_buffer = EventBuffer(drip_client, max_size=10, max_age=None)
+    for i in range(25):
+        event_buffer.record("{}@example.com".format(i), "Logged in")
+    assert len(drip_client.transport.requests) == 2
+    assert len(event_buffer) == 5
+    report = event_buffer.flush()
+    assert report.ok
+    assert json.loads(drip_client.transport.requests[-1]["data"])["batches"][0]["events"][0] == {
+        "email": "20@example.com", "action": "Logged in"}
+    assert event_buffer.flush() is None
+
+
+def test_drip_client_buffers_events():
+    drip_client = create_in_memory_drip_client()
+    drip_client.enable_event_buffer(max_age=None)
+    drip_client.record_event(TestConstants.test_email, "Logged in", {"plan": "pro"})
+    drip_client.record_event(TestConstants.test_email, "Logged out")
+    assert not drip_client.transport.requests
+    drip_client.close()
+    assert drip_client.transport.requests[-1]["url"] == drip_client.get_record_event_query_path_batches()
+    assert json.loads(drip_client.transport.requests[-1]["data"]) == {"batches": [{"events": [
+        {"email": TestConstants.test_email, "action": "Logged in", "properties": {"plan": "pro"}},
+        {"email": TestConstants.test_email, "action": "Logged out"}]}]}
+
+
+def test_tag_buffer_keeps_failed_changes_for_the_next_flush():
+    drip_client = create_in_memory_drip_client(statuses=[503])
+    tag_buffer = TagBuffer(drip_client, max_age=None)
+    tag_buffer.add_tag("a@example.com", "one")
+    tag_buffer.add_tag("b@example.com", "one")
+    assert not tag_buffer.flush().ok
+    assert tag_buffer.retained == 2
+    assert len(tag_buffer) == 2
+
+    tag_buffer.remove_tag("a@example.com", "one")
+    assert tag_buffer.flush().ok
+    assert sent_subscribers(drip_client)[-2:] == [
+        {"email": "a@example.com", "remove_tags": ["one"]},
+        {"email": "b@example.com", "tags": ["one"]}]
+    assert len(tag_buffer) == 0
+
+
+def test_event_buffer_caps_failed_events():
+    drip_client = create_in_memory_drip_client(statuses=[503])
+    event_buffer = EventBuffer(drip_client, max_size=10, max_age=None, max_retained=3)
+    for i in range(5):
+        event_buffer.record("{}@example.com".format(i), "Logged in")
+    event_buffer.flush()
+    assert event_buffer.retained == 3
+
+    event_buffer.close()
+    events = json.loads(drip_client.transport.requests[-1]["data"])["batches"][0]["events"]
+    assert [event["email"] for event in events] == ["2@example.com", "3@example.com", "4@example.com"]
+    assert event_buffer.retained == 0
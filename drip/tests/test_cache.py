@@ -0,0 +1,131 @@
+import json
+
+from drip.cache import LocalSubscriberCache, RedisSubscriberCache
+from drip.drip_retry import DripPy
+from drip.tests import FakeClock
+from drip.tests.test_drip import TestConstants
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.data = {}
+        self.mget_calls = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value.encode('utf-8')
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+subscriber_response = {"links": {}, "subscribers": [{"id": "z1togz2hcjrkpp5treip", "email": "john@acme.com"}]}
+
+
+def test_local_cache_ttl():
+    clock = FakeClock()
+    cache = LocalSubscriberCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_local_cache_lru_eviction():
+    cache = LocalSubscriberCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_local_cache_delete():
+    cache = LocalSubscriberCache()
+    cache.set("a", 1)
+    cache.delete("a", "missing")
+    assert cache.get("a") is None
+
+
+def test_redis_cache():
+    cache = RedisSubscriberCache(FakeRedis())
+    cache.set("john@acme.com", subscriber_response)
+    assert cache.get("john@acme.com") == subscriber_response
+    assert json.loads(cache.client.data["drip:subscriber:john@acme.com"].decode('utf-8')) == subscriber_response
+    assert cache.get_many(["john@acme.com", "missing"]) == {"john@acme.com": subscriber_response}
+    cache.delete("john@acme.com")
+    assert cache.get("john@acme.com") is None
+
+
+def test_local_cache_get_many():
+    clock = FakeClock()
+    cache = LocalSubscriberCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 5
+    cache.set("b", 2)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+    clock.now = 10
+    assert cache.get_many(["a", "b"]) == {"b": 2}
+
+
+def test_bulk_writes_invalidate_cache_in_one_read(mocker):
+    redis = FakeRedis()
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                         subscriber_cache=RedisSubscriberCache(redis))
+    drip_client.subscriber_cache.set("john@acme.com", subscriber_response)
+    drip_client.subscriber_cache.set("z1togz2hcjrkpp5treip", subscriber_response)
+    mocker.patch.object(drip_client, "dispatch", return_value=mocker.Mock(status_code=202))
+    mocker.patch.object(redis, "get", side_effect=AssertionError("one get per email"))
+    emails = ["{}@example.com".format(i) for i in range(999)] + ["john@acme.com"]
+    assert drip_client.update_subscriber_tag_with_new_batch([(email, "tag", None) for email in emails]).ok
+    assert redis.mget_calls == 1
+    assert redis.data == {}
+
+
+def create_cached_drip_client():
+    return DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                  subscriber_cache=LocalSubscriberCache())
+
+
+def test_fetch_subscriber_reads_through_cache(mocker):
+    drip_client = create_cached_drip_client()
+    mocker.patch.object(drip_client, "send_request", return_value=subscriber_response)
+    assert drip_client.fetch_subscriber("John@acme.com") == subscriber_response
+    assert drip_client.fetch_subscriber("john@acme.com") == subscriber_response
+    assert drip_client.fetch_subscriber("z1togz2hcjrkpp5treip") == subscriber_response
+    assert drip_client.send_request.call_count == 1
+
+
+def test_fetch_subscriber_does_not_cache_errors(mocker):
+    drip_client = create_cached_drip_client()
+    mocker.patch.object(drip_client, "send_request", return_value={})
+    drip_client.fetch_subscriber("john@acme.com")
+    drip_client.fetch_subscriber("john@acme.com")
+    assert drip_client.send_request.call_count == 2
+
+
+def test_writes_invalidate_cache(mocker):
+    drip_client = create_cached_drip_client()
+    mocker.patch.object(drip_client, "send_request", return_value=subscriber_response)
+    drip_client.fetch_subscriber("z1togz2hcjrkpp5treip")
+    drip_client.add_subscriber_tag("john@acme.com", TestConstants.test_tag)
+    assert len(drip_client.subscriber_cache) == 0
+    drip_client.fetch_subscriber("john@acme.com")
+    drip_client.update_subscriber_tag_with_new_batch([("john@acme.com", TestConstants.test_tag, None)])
+    assert len(drip_client.subscriber_cache) == 0
+    drip_client.fetch_subscriber("john@acme.com")
+    drip_client.unsubscribe_email("john@acme.com")
+    assert len(drip_client.subscriber_cache) == 0
+    drip_client.fetch_subscriber("john@acme.com")
+    drip_client.update_subscribers([{"email": "john@acme.com", "custom_fields": {"size": "M"}}], workers=2)
+    assert len(drip_client.subscriber_cache) == 0
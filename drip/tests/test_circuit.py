@@ -0,0 +1,107 @@
+import pytest
+import requests
+
+from drip.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from drip.drip import DripPy
+from drip.drip_retry import RetryPolicy
+from drip.exceptions import CircuitOpenError
+from drip.tests import FakeClock
+from drip.tests.test_drip import TestConstants
+from drip.transport import InMemoryTransport
+
+ENDPOINT = ":account_id/subscribers"
+
+
+def create_breaker(clock, events=None, **kwargs):
+    return CircuitBreaker(reset_timeout=30, clock=clock, listeners=[events.append] if events is not None else None,
+                          **kwargs)
+
+
+def fail(breaker, times, status=503):
+    for _ in range(times):
+        breaker.before_request("1", ENDPOINT)
+        breaker.after_request("1", ENDPOINT, status)
+
+
+def test_opens_after_consecutive_failures_and_recovers():
+    clock = FakeClock(1000.0)
+    events = []
+    breaker = create_breaker(clock, events, failure_threshold=3)
+    fail(breaker, 2)
+    breaker.before_request("1", ENDPOINT)
+    breaker.after_request("1", ENDPOINT, 404)
+    fail(breaker, 2)
+    assert breaker.state("1", ENDPOINT) == CLOSED
+    fail(breaker, 1)
+    assert breaker.state("1", ENDPOINT) == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_request("1", ENDPOINT)
+    assert excinfo.value.retry_after == 30
+    assert breaker.state("2", ENDPOINT) == CLOSED
+
+    clock.now += 30
+    assert breaker.state("1", ENDPOINT) == HALF_OPEN
+    breaker.before_request("1", ENDPOINT)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("1", ENDPOINT)
+    breaker.after_request("1", ENDPOINT, error=requests.exceptions.ConnectTimeout())
+    assert breaker.state("1", ENDPOINT) == OPEN
+
+    clock.now += 30
+    breaker.before_request("1", ENDPOINT)
+    breaker.after_request("1", ENDPOINT, 200)
+    assert breaker.states() == {("1", ENDPOINT): CLOSED}
+    assert [(event.old_state, event.new_state) for event in events] == [
+        (CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+    assert events[0].failures == 3
+
+
+def test_opens_on_error_rate():
+    breaker = create_breaker(FakeClock(1000.0), failure_threshold=100, window=10, min_requests=10, error_rate=0.5)
+    for _ in range(4):
+        fail(breaker, 1)
+        fail(breaker, 1, status=200)
+    fail(breaker, 1)
+    assert breaker.state("1", ENDPOINT) == CLOSED
+    fail(breaker, 1)
+    assert breaker.state("1", ENDPOINT) == OPEN
+    breaker.reset(account_id="1")
+    assert breaker.state("1", ENDPOINT) == CLOSED
+
+
+def test_stale_half_open_probe_is_replaced():
+    clock = FakeClock(1000.0)
+    breaker = create_breaker(clock, failure_threshold=1)
+    fail(breaker, 1)
+    clock.now += 30
+    breaker.before_request("1", ENDPOINT)
+    clock.now += 30
+    breaker.before_request("1", ENDPOINT)
+    breaker.after_request("1", ENDPOINT, 200)
+    assert breaker.state("1", ENDPOINT) == CLOSED
+
+
+def test_drip_fails_fast_without_retrying_an_open_circuit():
+    requests_sent = []
+
+    def handler(method, url, headers, data, params):
+        requests_sent.append(url)
+        return 503, {}, None
+
+    breaker = CircuitBreaker(failure_threshold=2)
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id, circuit_breaker=breaker,
+                         retry_policy=RetryPolicy(tries=5, sleep=lambda delay: None),
+                         transport=InMemoryTransport(handler))
+    with pytest.raises(CircuitOpenError):
+        drip_client.add_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)
+    assert len(requests_sent) == 2
+    assert breaker.state(TestConstants.test_account_id, ":account_id/subscribers") == OPEN
+    assert drip_client.metrics.snapshot()["requests"] == 2
+
+    report = drip_client.update_subscriber_tag_with_new_batch([(TestConstants.test_email, "tag", None)])
+    assert len(requests_sent) == 4
+    assert report.failed[0].attempts == 3
+    assert isinstance(report.failed[0].error, CircuitOpenError)
+    report = drip_client.resend_failed(report)
+    assert len(requests_sent) == 4
+    assert isinstance(report.failed[0].error, CircuitOpenError)
@@ -1,10 +1,15 @@
 import json
 import logging
+import time
 
+import pytest
 import requests
 
+from drip.cache import LocalSubscriberCache
 from drip.drip_retry import DripPy
+from drip.exceptions import DripError, DripResponseError
 from drip.tests import return_response
+from drip.transport import DEFAULT_TIMEOUT
 
 logging.basicConfig(level=logging.DEBUG)
 log = logging.getLogger(__name__)
@@ -91,6 +96,16 @@ def test_get_update_subscriber_query_path_batches():
     log.debug("get_update_subscriber_query_path_batches asserted")
 
 
+def test_get_record_event_query_paths():
+    drip_client = create_drip_client()
+    assert drip_client.get_record_event_query_path() == "{}{}/events".format(drip_client.endpoint,
+                                                                             drip_client.account_id)
+    assert drip_client.get_record_event_query_path_batches() == "{}{}/events/batches".format(
+        drip_client.endpoint, drip_client.account_id)
+    assert drip_client.get_query_path_template(
+        drip_client.get_record_event_query_path_batches()) == ":account_id/events/batches"
+
+
 def test_fetch_subscriber(mocker):
     drip_client = create_drip_client()
     mocker.patch.object(drip_client, 'send_request')
@@ -105,10 +120,27 @@ def test_unsubscribe_email(mocker):
     drip_client.send_request.return_value = "Dummy Value"
     drip_client.unsubscribe_email(TestConstants.test_email)
     log.debug("unsubcribe_email completed")
-    drip_client.send_request.assert_called_with(drip_client.get_unsubscribe_email_query_path(TestConstants.test_email))
+    drip_client.send_request.assert_called_with(drip_client.get_unsubscribe_email_query_path(TestConstants.test_email),
+                                                response_mode="status")
     log.debug("Asserted that send_request happened with correct args")
 
 
+def test_unsubscribe_emails(mocker):
+    emails = ["{}{}".format(i, TestConstants.test_email) for i in range(2500)]
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "dispatch", side_effect=[
+        return_response(202), return_response(422), return_response(202)])
+    report = drip_client.unsubscribe_emails(email for email in emails + emails[:1])
+    assert drip_client.dispatch.call_count == 3
+    url, body = drip_client.dispatch.call_args_list[2][0][:2]
+    assert url == drip_client.get_unsubscribe_query_path_batches()
+    assert json.loads(body) == {"batches": [{"subscribers": [{"email": email}
+                                                             for email in emails[2000:] + emails[:1]]}]}
+    assert [partition.index for partition in report.failed] == [1]
+    assert report.failed_emails == emails[1000:2000]
+    assert drip_client.get_query_path_template(url) == ":account_id/unsubscribes/batches"
+
+
 def test_add_subscriber_tag(mocker):
     drip_client = create_drip_client()
     mocker.patch.object(drip_client, 'send_request')
@@ -116,7 +148,7 @@ def test_add_subscriber_tag(mocker):
     drip_client.add_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)
     log.debug("add_subscriber_tag completed")
     drip_client.send_request.assert_called_with(drip_client.get_update_subscriber_query_path(), {
-        "subscribers": [{'email': TestConstants.test_email, 'tags': [TestConstants.test_tag]}]})
+        "subscribers": [{'email': TestConstants.test_email, 'tags': [TestConstants.test_tag]}]}, response_mode="status")
     log.debug("Asserted that send_request happened with correct args")
 
 
@@ -127,13 +159,36 @@ def test_remove_subscriber_tag(mocker):
     drip_client.remove_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)
     log.debug("remove_subscriber_tag completed")
     drip_client.send_request.assert_called_with(drip_client.get_update_subscriber_query_path(), {"subscribers": [{
-        'email': TestConstants.test_email, 'remove_tags': [TestConstants.test_tag]}]})
+        'email': TestConstants.test_email, 'remove_tags': [TestConstants.test_tag]}]}, response_mode="status")
     log.debug("Asserted that send_request happened with correct args")
 
 
+def test_record_event(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "send_request")
+    drip_client.record_event(TestConstants.test_email, "Logged in", {"plan": "pro"})
+    drip_client.send_request.assert_called_with(drip_client.get_record_event_query_path(), {"events": [{
+        "email": TestConstants.test_email, "action": "Logged in", "properties": {"plan": "pro"}}]},
+        response_mode="status")
+
+
+def test_record_events(mocker):
+    events = [{"email": "{}{}".format(i, TestConstants.test_email), "action": "Logged in"} for i in range(1500)]
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
+    report = drip_client.record_events(iter(events))
+    assert report.ok
+    assert len(report) == 2
+    url, body = drip_client.dispatch.call_args_list[1][0][:2]
+    assert url == drip_client.get_record_event_query_path_batches()
+    assert json.loads(body) == {"batches": [{"events": events[1000:]}]}
+
+
 def test_update_subscriber_tag_with_new_batch_empty_list():
     drip_client = create_drip_client()
-    assert drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=[]) == {}
+    report = drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=[])
+    assert len(report) == 0
+    assert report.ok
     log.debug("update_subscriber_tag_with_new_batch with empty list worked")
 
 
@@ -141,10 +196,9 @@ def test_update_subscriber_tag_with_new_batch_one_subscriber(mocker):
     subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
     list_of_subscribers = [subscriber]
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    drip_client.send_request.assert_called_once()
+    drip_client.dispatch.assert_called_once()
     log.debug("update_subscriber_tag_with_new_batch one subscriber")
 
 
@@ -152,10 +206,9 @@ def test_update_subscriber_tag_with_new_batch_one_subscriber_remove_tag(mocker):
     subscriber = (TestConstants.test_email, TestConstants.test_tag, TestConstants.test_remove_tag)
     list_of_subscribers = [subscriber]
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    drip_client.send_request.assert_called_once()
+    drip_client.dispatch.assert_called_once()
     log.debug("update_subscriber_tag_with_new_batch one subscriber with remove tag")
 
 
@@ -163,10 +216,9 @@ def test_test_update_subscriber_tag_with_new_batch_10_subscribers(mocker):
     subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
     list_of_subscribers = [subscriber] * 10
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    assert drip_client.send_request.call_count == 1
+    assert drip_client.dispatch.call_count == 1
     log.debug("update_subscriber_tag_with_new_batch with 10 subscriber")
 
 
@@ -174,10 +226,9 @@ def test_test_update_subscriber_tag_with_new_batch_10_subscribers_with_remove_ta
     subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
     list_of_subscribers = [subscriber] * 10
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    assert drip_client.send_request.call_count == 1
+    assert drip_client.dispatch.call_count == 1
     log.debug("update_subscriber_tag_with_new_batch with 10 subscriber with remove tag")
 
 
@@ -185,10 +236,9 @@ def test_test_update_subscriber_tag_with_new_batch_1000_subscribers(mocker):
     subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
     list_of_subscribers = [subscriber] * 1000
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    assert drip_client.send_request.call_count == 1
+    assert drip_client.dispatch.call_count == 1
     log.debug("update_subscriber_tag_with_new_batch with 1000 subscriber")
 
 
@@ -196,10 +246,9 @@ def test_test_update_subscriber_tag_with_new_batch_1010_subscribers(mocker):
     subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
     list_of_subscribers = [subscriber] * 1010
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    assert drip_client.send_request.call_count == 2
+    assert drip_client.dispatch.call_count == 2
     log.debug("update_subscriber_tag_with_new_batch with 1010 subscriber")
 
 
@@ -207,10 +256,9 @@ def test_test_update_subscriber_tag_with_new_batch_1000_subscribers_with_remove_
     subscriber = (TestConstants.test_email, TestConstants.test_tag, TestConstants.test_remove_tag)
     list_of_subscribers = [subscriber] * 1000
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    assert drip_client.send_request.call_count == 1
+    assert drip_client.dispatch.call_count == 1
     log.debug("update_subscriber_tag_with_new_batch with 1000 subscriber")
 
 
@@ -218,58 +266,342 @@ def test_test_update_subscriber_tag_with_new_batch_1010_subscribers_with_remove_
     subscriber = (TestConstants.test_email, TestConstants.test_tag, TestConstants.test_remove_tag)
     list_of_subscribers = [subscriber] * 1010
     drip_client = create_drip_client()
-    mocker.patch.object(drip_client, "send_request")
-    drip_client.send_request.return_value = "Dummy Value"
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
     drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers)
-    assert drip_client.send_request.call_count == 2
+    assert drip_client.dispatch.call_count == 2
     log.debug("update_subscriber_tag_with_new_batch with 1010 subscriber")
 
 
 def test_send_request_default(mocker):
     drip_client = create_drip_client()
-    mocker.patch.object(requests, 'post')
+    mocker.patch.object(drip_client.session, 'post')
     resp = return_response()
-    requests.post.return_value = resp
+    drip_client.session.post.return_value = resp
     assert drip_client.send_request(request_url=TestConstants.test_request_url) == resp
-    assert requests.post.call_count == 1
-    requests.post.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), data=json.dumps({}),
-                                     headers=TestConstants.test_headers)
+    assert drip_client.session.post.call_count == 1
+    drip_client.session.post.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''),
+                                                 data=json.dumps({}),
+                                                 headers=TestConstants.test_headers, timeout=DEFAULT_TIMEOUT)
 
 
 def test_send_request_default_202_response(mocker):
     drip_client = create_drip_client()
-    mocker.patch.object(requests, 'post')
-    requests.post.return_value = return_response(202)
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
     assert drip_client.send_request(request_url=TestConstants.test_request_url) == {}
-    assert requests.post.call_count == 1
-    requests.post.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), data=json.dumps({}),
-                                     headers=TestConstants.test_headers)
+    assert drip_client.session.post.call_count == 1
+    drip_client.session.post.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''),
+                                                 data=json.dumps({}),
+                                                 headers=TestConstants.test_headers, timeout=DEFAULT_TIMEOUT)
 
 
 def test_send_request_default_201_response(mocker):
     drip_client = create_drip_client()
-    mocker.patch.object(requests, 'post')
-    requests.post.return_value = return_response(201)
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(201)
     assert drip_client.send_request(request_url=TestConstants.test_request_url) == {}
-    assert requests.post.call_count == 1
-    requests.post.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), data=json.dumps({}),
-                                     headers=TestConstants.test_headers)
+    assert drip_client.session.post.call_count == 1
+    drip_client.session.post.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''),
+                                                 data=json.dumps({}),
+                                                 headers=TestConstants.test_headers, timeout=DEFAULT_TIMEOUT)
 
 
 def test_send_request_get(mocker):
     drip_client = create_drip_client()
-    mocker.patch.object(requests, 'get')
+    mocker.patch.object(drip_client.session, 'get')
     resp = return_response(200)
-    requests.get.return_value = resp
+    drip_client.session.get.return_value = resp
     assert drip_client.send_request(request_url=TestConstants.test_request_url, method="GET") == resp
-    assert requests.get.call_count == 1
-    requests.get.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), params={})
+    assert drip_client.session.get.call_count == 1
+    drip_client.session.get.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), params={},
+                                                timeout=DEFAULT_TIMEOUT)
+
+
+def test_send_request_status_mode_skips_decoding(mocker):
+    drip_client = create_drip_client()
+    resp = return_response(200)
+    mocker.patch.object(resp, "json")
+    mocker.patch.object(drip_client.session, 'post', return_value=resp)
+    assert drip_client.send_request(TestConstants.test_request_url, response_mode="status") == 200
+    assert drip_client.add_subscriber_tag(TestConstants.test_email, TestConstants.test_tag) == 200
+    assert not resp.json.called
+
+
+def test_send_request_lazy_mode(mocker):
+    drip_client = create_drip_client()
+    resp = return_response(200)
+    resp._content = b'{"subscribers": []}'
+    mocker.patch.object(drip_client.session, 'get', return_value=resp)
+    result = drip_client.send_request(TestConstants.test_request_url, method="GET", response_mode="lazy")
+    assert not result.decoded
+    assert result == {"subscribers": []}
+    assert result.decoded
+    drip_client.session.get.return_value = return_response(500)
+    assert drip_client.send_request(TestConstants.test_request_url, method="GET", response_mode="lazy") == {}
+
+
+def test_send_request_unknown_response_mode():
+    drip_client = create_drip_client()
+    with pytest.raises(ValueError):
+        drip_client.send_request(TestConstants.test_request_url, response_mode="raw")
 
 
 def test_send_request_get_201_response(mocker):
     drip_client = create_drip_client()
-    mocker.patch.object(requests, 'get')
-    requests.get.return_value = return_response(201)
+    mocker.patch.object(drip_client.session, 'get')
+    drip_client.session.get.return_value = return_response(201)
     assert drip_client.send_request(request_url=TestConstants.test_request_url, method="GET") == {}
-    assert requests.get.call_count == 1
-    requests.get.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), params={})
+    assert drip_client.session.get.call_count == 1
+    drip_client.session.get.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), params={},
+                                                timeout=DEFAULT_TIMEOUT)
+
+
+def test_send_request_reuses_session(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
+    drip_client.add_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)
+    drip_client.remove_subscriber_tag(TestConstants.test_email, TestConstants.test_tag)
+    assert drip_client.session.post.call_count == 2
+
+
+def test_send_request_timeout(mocker):
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id, timeout=(3, 10))
+    mocker.patch.object(drip_client.session, 'get')
+    drip_client.session.get.return_value = return_response(201)
+    drip_client.send_request(request_url=TestConstants.test_request_url, method="GET")
+    drip_client.session.get.assert_called_with(TestConstants.test_request_url, auth=('test_token', ''), params={},
+                                                timeout=(3, 10))
+
+
+def test_session_pool_size():
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id, pool_maxsize=25)
+    adapter = drip_client.session.get_adapter(DripDefaultValues.endpoint)
+    assert adapter._pool_maxsize == 25
+
+
+def test_close_on_exit(mocker):
+    with create_drip_client() as drip_client:
+        mocker.patch.object(drip_client.session, 'close')
+    drip_client.session.close.assert_called_once_with()
+
+
+def test_update_subscriber_tag_with_new_batch_parallel(mocker):
+    subscriber = (TestConstants.test_email, TestConstants.test_tag, None)
+    list_of_subscribers = [subscriber] * 5010
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
+    report = drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers, workers=4)
+    assert [partition.index for partition in report] == list(range(6))
+    assert [partition.status for partition in report] == [202] * 6
+    assert report.ok
+
+
+def test_update_subscriber_tag_with_new_batch_parallel_failures(mocker):
+    list_of_subscribers = [("{}{}".format(i, TestConstants.test_email), TestConstants.test_tag, None)
+                           for i in range(3000)]
+    drip_client = create_drip_client()
+    error = requests.exceptions.ConnectionError()
+
+    def dispatch(url, payload, method, attempt):
+        if json.loads(payload)["batches"][0]["subscribers"][0]["email"] == list_of_subscribers[1000][0]:
+            raise error
+        return return_response(202)
+
+    mocker.patch.object(drip_client, "dispatch", side_effect=dispatch)
+    report = drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers, workers=3)
+    assert not report.ok
+    assert [partition.index for partition in report.failed] == [1]
+    assert report.failed[0].error is error
+    assert report.failed[0].status is None
+    assert report.failed_emails == [subscriber[0] for subscriber in list_of_subscribers[1000:2000]]
+    assert [partition.records for partition in report.succeeded] == [None, None]
+
+
+def test_update_subscriber_tag_with_new_batch_parallel_preserve_order(mocker):
+    list_of_subscribers = [(TestConstants.test_email, "{}".format(i), None) for i in range(3500)]
+    drip_client = create_drip_client()
+    sent_tags = []
+
+    def dispatch(url, payload, method, attempt):
+        sent_tags.extend(int(subscriber["tags"][0]) for subscriber in json.loads(payload)["batches"][0]["subscribers"])
+        return return_response(202)
+
+    mocker.patch.object(drip_client, "dispatch", side_effect=dispatch)
+    report = drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=list_of_subscribers, workers=4,
+                                                              preserve_order=True)
+    assert sent_tags == list(range(3500))
+    assert len(report) == 4
+
+
+def test_update_subscriber_tag_with_new_batch_streams_generator(mocker):
+    consumed = []
+
+    def generate_subscribers():
+        for i in range(2500):
+            consumed.append(i)
+            yield (TestConstants.test_email, TestConstants.test_tag, None)
+
+    drip_client = create_drip_client()
+    consumed_before_send = []
+    mocker.patch.object(drip_client, "dispatch", side_effect=lambda url, payload, method, attempt: (
+        consumed_before_send.append(len(consumed)) or return_response(202)))
+    assert drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers=generate_subscribers()).ok
+    assert consumed_before_send == [1000, 2000, 2500]
+
+
+def test_send_request_waits_on_rate_limiter(mocker):
+    rate_limiter = mocker.Mock()
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                         rate_limiter=rate_limiter)
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
+    drip_client.send_request(request_url=TestConstants.test_request_url)
+    rate_limiter.acquire.assert_called_once_with()
+
+
+def test_send_request_429_pauses_rate_limiter(mocker):
+    rate_limiter = mocker.Mock()
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                         rate_limiter=rate_limiter)
+    mocker.patch.object(drip_client.session, 'post')
+    resp = return_response(429)
+    resp.headers['Retry-After'] = '30'
+    drip_client.session.post.return_value = resp
+    assert drip_client.send_request(request_url=TestConstants.test_request_url) == {}
+    rate_limiter.pause.assert_called_once_with(30.0)
+
+
+def test_update_subscribers_merges_within_batch(mocker):
+    subscribers = [{"email": TestConstants.test_email, "tags": ["{}".format(i)]} for i in range(1500)]
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
+    assert drip_client.update_subscribers(subscribers).ok
+    assert drip_client.dispatch.call_count == 2
+    first_batch = json.loads(drip_client.dispatch.call_args_list[0][0][1])["batches"][0]["subscribers"]
+    assert first_batch == [{"email": TestConstants.test_email, "tags": ["{}".format(i) for i in range(1000)]}]
+
+
+def test_send_request_gzip_body(mocker):
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                         compress_threshold=10)
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
+    drip_client.send_request(TestConstants.test_request_url, {"subscribers": [{'email': TestConstants.test_email}]})
+    args, kwargs = drip_client.session.post.call_args
+    assert kwargs["headers"]["Content-Encoding"] == "gzip"
+    assert kwargs["data"][:2] == b'\x1f\x8b'
+
+
+def test_send_request_pre_encoded_payload(mocker):
+    drip_client = create_drip_client()
+    serializer = mocker.Mock(return_value='{"subscribers": []}')
+    drip_client.serializer = serializer
+    body = drip_client.encode_payload({"subscribers": []})
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
+    drip_client.send_request(TestConstants.test_request_url, body)
+    drip_client.send_request(TestConstants.test_request_url, body)
+    assert serializer.call_count == 1
+    assert drip_client.session.post.call_args[1]["data"] == '{"subscribers": []}'
+
+
+def test_get_list_subscribers_query_path():
+    drip_client = create_drip_client()
+    assert drip_client.get_list_subscribers_query_path() == "{}{}/subscribers".format(drip_client.endpoint,
+                                                                                      drip_client.account_id)
+
+
+def subscriber_pages(total_pages, per_page=2):
+    def send_request(url, payload, method):
+        page = payload["page"]
+        return {"meta": {"page": page, "total_pages": total_pages},
+                "subscribers": [{"email": "{}-{}@example.com".format(page, i)} for i in range(per_page)]}
+    return send_request
+
+
+def test_iter_subscribers(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "send_request", side_effect=subscriber_pages(3))
+    emails = [subscriber["email"] for subscriber in drip_client.iter_subscribers(status="all", tags=["a", "b"])]
+    assert emails == ["1-0@example.com", "1-1@example.com", "2-0@example.com", "2-1@example.com",
+                      "3-0@example.com", "3-1@example.com"]
+    assert drip_client.send_request.call_count == 3
+    drip_client.send_request.assert_called_with(drip_client.get_list_subscribers_query_path(), {
+        "status": "all", "tags": "a,b", "per_page": 1000, "page": 3}, method="GET")
+
+
+def test_iter_subscribers_prefetches_next_page(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "send_request", side_effect=subscriber_pages(2))
+    subscribers = drip_client.iter_subscribers()
+    next(subscribers)
+    for _ in range(100):
+        if drip_client.send_request.call_count == 2:
+            break
+        time.sleep(0.01)
+    assert drip_client.send_request.call_count == 2
+
+
+def test_iter_subscribers_without_prefetch(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "send_request", side_effect=subscriber_pages(2))
+    subscribers = drip_client.iter_subscribers(prefetch=False)
+    next(subscribers)
+    assert drip_client.send_request.call_count == 1
+    assert len(list(subscribers)) == 3
+
+
+def test_iter_subscribers_error(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "send_request", return_value={})
+    with pytest.raises(DripError):
+        list(drip_client.iter_subscribers())
+
+
+def fetch_responses(statuses):
+    def request(url, payload=None, method="POST"):
+        subscriber_id = url.rsplit("/", 1)[1]
+        resp = return_response(statuses.get(subscriber_id, 200))
+        resp._content = json.dumps({"subscribers": [{"id": subscriber_id}]}).encode('utf-8')
+        return resp
+    return request
+
+
+def test_fetch_subscribers(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "request", side_effect=fetch_responses({"c": 404}))
+    results = drip_client.fetch_subscribers(["a", "b", "a", "A", "c"], workers=2)
+    assert len(drip_client.request.call_args_list) == 3
+    assert results["subscribers"] == {"a": {"subscribers": [{"id": "a"}]}, "b": {"subscribers": [{"id": "b"}]}}
+    assert list(results["errors"]) == ["c"]
+    assert isinstance(results["errors"]["c"], DripResponseError)
+    assert results["errors"]["c"].status_code == 404
+
+
+def test_iter_fetch_subscribers_streams_results(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "request", side_effect=fetch_responses({}))
+    ids = ["{}".format(i) for i in range(50)]
+    outcomes = list(drip_client.iter_fetch_subscribers(iter(ids), workers=4))
+    assert sorted(subscriber_id for subscriber_id, response, error in outcomes) == sorted(ids)
+    assert all(error is None for subscriber_id, response, error in outcomes)
+
+
+def test_fetch_subscribers_reads_through_cache(mocker):
+    drip_client = DripPy(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                         subscriber_cache=LocalSubscriberCache())
+    mocker.patch.object(drip_client, "request", side_effect=fetch_responses({}))
+    drip_client.fetch_subscribers(["a", "b"])
+    drip_client.fetch_subscribers(["a", "b", "c"])
+    assert drip_client.request.call_count == 3
+
+
+def test_get_query_path_template():
+    drip_client = create_drip_client()
+    assert drip_client.get_query_path_template(drip_client.get_fetch_subscriber_query_path(
+        TestConstants.test_subscriber_id)) == ":account_id/subscribers/:id"
+    assert drip_client.get_query_path_template(drip_client.get_unsubscribe_email_query_path(
+        TestConstants.test_email)) == ":account_id/subscribers/:id/remove"
+    assert drip_client.get_query_path_template(
+        drip_client.get_update_subscriber_query_path_batches()) == ":account_id/subscribers/batches"
@@ -0,0 +1,102 @@
+import pytest
+import requests
+
+from drip.drip_retry import DripPyRetry, RetryPolicy
+from drip.tests import FakeClock, return_response
+from drip.tests.test_drip import TestConstants
+
+
+def create_policy(**kwargs):
+    clock = FakeClock()
+    kwargs.setdefault("random", lambda: 1.0)
+    return RetryPolicy(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def sequence(*outcomes):
+    outcomes = list(outcomes)
+    attempts = []
+
+    def func(attempt):
+        attempts.append(attempt)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return func, attempts
+
+
+def test_retry_policy_retries_statuses():
+    policy, clock = create_policy()
+    func, attempts = sequence(return_response(503), return_response(500), return_response(200))
+    assert policy.call(func).status_code == 200
+    assert attempts == [1, 2, 3]
+    assert clock.sleeps == [1, 2]
+
+
+def test_retry_policy_does_not_retry_client_errors():
+    policy, clock = create_policy()
+    func, attempts = sequence(return_response(422))
+    assert policy.call(func).status_code == 422
+    assert attempts == [1]
+
+
+def test_retry_policy_gives_up_after_tries():
+    policy, clock = create_policy(tries=2)
+    func, attempts = sequence(return_response(503), return_response(502))
+    assert policy.call(func).status_code == 502
+    assert attempts == [1, 2]
+
+
+def test_retry_policy_retries_exceptions():
+    policy, clock = create_policy(tries=2)
+    error = requests.exceptions.ConnectionError()
+    func, attempts = sequence(error, error)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.call(func)
+    assert attempts == [1, 2]
+
+
+def test_retry_policy_does_not_retry_other_exceptions():
+    policy, clock = create_policy()
+    func, attempts = sequence(ValueError())
+    with pytest.raises(ValueError):
+        policy.call(func)
+    assert attempts == [1]
+
+
+def test_retry_policy_full_jitter():
+    policy, clock = create_policy(random=lambda: 0.5, tries=4, delay=2, backoff=3, max_delay=10)
+    assert [policy.get_delay(attempt) for attempt in (1, 2, 3)] == [1.0, 3.0, 5.0]
+
+
+def test_retry_policy_honors_retry_after():
+    policy, clock = create_policy()
+    resp = return_response(429)
+    resp.headers['Retry-After'] = '20'
+    func, attempts = sequence(resp, return_response(202))
+    assert policy.call(func).status_code == 202
+    assert clock.sleeps == [20.0]
+
+
+def test_retry_policy_deadline():
+    policy, clock = create_policy(tries=10, deadline=5)
+    func, attempts = sequence(*[return_response(503)] * 10)
+    assert policy.call(func).status_code == 503
+    assert clock.sleeps == [1, 2]
+
+
+def test_drip_py_retry_send_request(mocker):
+    policy, clock = create_policy()
+    drip_client = DripPyRetry(token=TestConstants.test_token, account_id=TestConstants.test_account_id,
+                              retry_policy=policy)
+    mocker.patch.object(drip_client.drip_py.session, 'post')
+    drip_client.drip_py.session.post.side_effect = [return_response(503), return_response(202)]
+    assert drip_client.send_request(request_url=TestConstants.test_request_url) == {}
+    assert drip_client.drip_py.session.post.call_count == 2
+
+
+def test_drip_py_retry_caches_methods():
+    drip_client = DripPyRetry(token=TestConstants.test_token, account_id=TestConstants.test_account_id)
+    assert drip_client.fetch_subscriber is drip_client.fetch_subscriber
+    assert drip_client.token == TestConstants.test_token
+    assert drip_client.drip_py.retry_policy is drip_client.retry_policy
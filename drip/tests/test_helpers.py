@@ -0,0 +1,143 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from drip.helpers import (BackgroundCall, build_event, build_unsubscribe_batch_payload, chunks, email_lane,
+                          iter_in_workers, partition, partition_into_lanes, run_in_workers)
+
+
+def test_chunks():
+    assert list(chunks([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+
+
+def test_partition_empty():
+    assert partition([], 1000) == []
+
+
+def test_email_lane_is_stable():
+    assert email_lane("Lead@Example.com", 8) == email_lane("lead@example.com", 8)
+    assert 0 <= email_lane("lead@example.com", 8) < 8
+
+
+def test_partition_into_lanes():
+    emails = ["{}@example.com".format(i) for i in range(100)]
+    lanes = list(partition_into_lanes(emails, 10, 3, key=lambda email: email))
+    assert sorted(email for lane, chunk in lanes for email in chunk) == sorted(emails)
+    for lane, chunk in lanes:
+        assert len(chunk) <= 10
+        assert all(email_lane(email, 3) == lane for email in chunk)
+
+
+def test_run_in_workers_bounds_concurrency():
+    state = {"in_flight": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def func(item):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(0.01)
+        with lock:
+            state["in_flight"] -= 1
+        return item * 2
+
+    outcomes = run_in_workers(func, ((None, i) for i in range(20)), 3)
+    assert outcomes == [(i * 2, None) for i in range(20)]
+    assert state["peak"] <= 3
+
+
+def test_run_in_workers_ordered_lanes():
+    seen = []
+
+    def func(item):
+        seen.append(item)
+        return item
+
+    tasks = [(i % 2, i) for i in range(10)]
+    run_in_workers(func, tasks, 2, ordered=True)
+    assert [item for item in seen if item % 2 == 0] == [0, 2, 4, 6, 8]
+    assert [item for item in seen if item % 2 == 1] == [1, 3, 5, 7, 9]
+
+
+def test_run_in_workers_collects_errors():
+    error = ValueError()
+
+    def func(item):
+        if item == 1:
+            raise error
+        return item
+
+    assert run_in_workers(func, ((None, i) for i in range(3)), 2) == [(0, None), (None, error), (2, None)]
+
+
+def test_chunks_generator_is_lazy():
+    consumed = []
+
+    def generate():
+        for i in range(5):
+            consumed.append(i)
+            yield i
+
+    iterator = chunks(generate(), 2)
+    assert next(iterator) == [0, 1]
+    assert consumed == [0, 1]
+    assert list(iterator) == [[2, 3], [4]]
+
+
+def test_background_call():
+    call = BackgroundCall(lambda a, b: a + b, 1, b=2)
+    assert call.result() == 3
+
+
+def test_background_call_error():
+    def fail():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        BackgroundCall(fail).result()
+
+
+def test_iter_in_workers():
+    error = ValueError()
+
+    def func(item):
+        if item == 3:
+            raise error
+        return item * 2
+
+    outcomes = sorted(iter_in_workers(func, iter(range(10)), 3), key=lambda outcome: outcome[0])
+    assert outcomes == [(i, None, error) if i == 3 else (i, i * 2, None) for i in range(10)]
+
+
+def test_iter_in_workers_stops_threads_when_closed_early():
+    threads = threading.active_count()
+    consumed = []
+
+    def items():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    for outcome in iter_in_workers(lambda item: item, items(), 8):
+        break
+    deadline = time.time() + 2
+    while threading.active_count() > threads and time.time() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == threads
+    assert len(consumed) < 1000
+
+
+def test_build_event():
+    assert build_event("a@example.com", "Logged in") == {"email": "a@example.com", "action": "Logged in"}
+    assert build_event("a@example.com", "Logged in", {"plan": "pro"}, datetime.datetime(2017, 1, 2, 3, 4, 5),
+                       prospect=True) == {"email": "a@example.com", "action": "Logged in", "prospect": True,
+                                          "properties": {"plan": "pro"}, "occurred_at": "2017-01-02T03:04:05"}
+    assert build_event("a@example.com", "Logged in", occurred_at="2017-01-02T03:04:05Z")["occurred_at"] == \
+        "2017-01-02T03:04:05Z"
+
+
+def test_build_unsubscribe_batch_payload_skips_duplicates():
+    assert build_unsubscribe_batch_payload(["a@example.com", "b@example.com", "A@example.com"]) == {
+        "batches": [{"subscribers": [{"email": "a@example.com"}, {"email": "b@example.com"}]}]}
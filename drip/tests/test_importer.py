@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+from drip.exceptions import DripBatchError
+from drip.importer import BulkImporter, read_checkpoint, write_checkpoint
+from drip.tests import create_in_memory_drip_client, sent_subscribers
+
+
+def write_jsonl(path, count, domain="example.com"):
+    with open(path, 'w') as output:
+        for i in range(count):
+            output.write(json.dumps({"email": "{}@{}".format(i, domain), "tags": ["Customer"]}) + "\n")
+
+
+def test_import_jsonl(tmpdir):
+    path = str(tmpdir.join("subscribers.jsonl"))
+    write_jsonl(path, 2500)
+    drip_client = create_in_memory_drip_client()
+    assert BulkImporter(drip_client, path).run() == {"records": 2500, "batches": 3, "resumed_from": 0,
+                                                     "invalid": 0}
+    assert len(drip_client.transport.requests) == 3
+    assert [subscriber["email"] for subscriber in sent_subscribers(drip_client)] == [
+        "{}@example.com".format(i) for i in range(2500)]
+    assert not os.path.exists(path + ".checkpoint")
+
+
+def test_import_csv(tmpdir):
+    path = str(tmpdir.join("subscribers.csv"))
+    with open(path, 'wb') as output:
+        output.write(b'\xef\xbb\xbfemail,tags,remove_tags,shirt_size\r\n'
+                     b'a@example.com,Customer;SEO,Prospect,Medium\r\n'
+                     b'\r\n'
+                     b'"b@example.com",Customer,,\r\n')
+    drip_client = create_in_memory_drip_client()
+    assert BulkImporter(drip_client, path).run()["records"] == 2
+    assert sent_subscribers(drip_client) == [
+        {"email": "a@example.com", "tags": ["Customer", "SEO"], "remove_tags": ["Prospect"],
+         "custom_fields": {"shirt_size": "Medium"}},
+        {"email": "b@example.com", "tags": ["Customer"]}]
+
+
+def test_import_resumes_from_checkpoint(tmpdir):
+    path = str(tmpdir.join("subscribers.jsonl"))
+    write_jsonl(path, 2500)
+    drip_client = create_in_memory_drip_client(statuses=[202, 500])
+    importer = BulkImporter(drip_client, path)
+    with pytest.raises(DripBatchError):
+        importer.run()
+    checkpoint = read_checkpoint(importer.checkpoint_path)
+    assert checkpoint["records"] == 1000
+    assert checkpoint["batches"] == 1
+
+    drip_client = create_in_memory_drip_client()
+    assert BulkImporter(drip_client, path).run() == {"records": 2500, "batches": 3,
+                                                     "resumed_from": checkpoint["offset"], "invalid": 0}
+    assert [subscriber["email"] for subscriber in sent_subscribers(drip_client)] == [
+        "{}@example.com".format(i) for i in range(1000, 2500)]
+
+
+def test_import_ignores_checkpoint_of_other_file(tmpdir):
+    path = str(tmpdir.join("subscribers.jsonl"))
+    write_jsonl(path, 10)
+    write_checkpoint(path + ".checkpoint", {"size": 1, "offset": 100, "records": 5, "batches": 1})
+    drip_client = create_in_memory_drip_client()
+    assert BulkImporter(drip_client, path).run() == {"records": 10, "batches": 1, "resumed_from": 0,
+                                                     "invalid": 0}
+
+
+def test_import_ignores_checkpoint_of_file_with_same_size(tmpdir):
+    path = str(tmpdir.join("subscribers.jsonl"))
+    write_jsonl(path, 2500)
+    with pytest.raises(DripBatchError):
+        BulkImporter(create_in_memory_drip_client(statuses=[202, 500]), path).run()
+    stat = os.stat(path)
+    write_jsonl(path, 2500, domain="example.org")
+    os.utime(path, (stat.st_atime, stat.st_mtime))
+    assert os.path.getsize(path) == stat.st_size
+
+    drip_client = create_in_memory_drip_client()
+    assert BulkImporter(drip_client, path).run()["resumed_from"] == 0
+    assert len(sent_subscribers(drip_client)) == 2500
+
+
+def test_import_skips_invalid_rows(tmpdir):
+    path = str(tmpdir.join("subscribers.csv"))
+    header = b'email,tags\n'
+    with open(path, 'wb') as output:
+        output.write(header + b'a@example.com,Customer\n' + b',Customer\n' + b'b@example.com,Customer\n')
+    drip_client = create_in_memory_drip_client()
+    importer = BulkImporter(drip_client, path, batch_size=1)
+    assert importer.run() == {"records": 2, "batches": 2, "resumed_from": 0, "invalid": 1}
+    assert importer.invalid_rows == [len(header) + len(b'a@example.com,Customer\n')]
+    assert [subscriber["email"] for subscriber in sent_subscribers(drip_client)] == ["a@example.com", "b@example.com"]
+
+    path = str(tmpdir.join("subscribers.jsonl"))
+    with open(path, 'w') as output:
+        output.write('{"email": "a@example.com"}\n{"tags": ["Customer"]}\n{"email": \n[1]\n')
+    importer = BulkImporter(create_in_memory_drip_client(), path)
+    assert importer.run()["invalid"] == 3
+    assert len(importer.invalid_rows) == 3
@@ -0,0 +1,88 @@
+import pytest
+
+from drip.metrics import RequestEvent, RequestMetrics, RequestObserver
+from drip.tests import return_response
+from drip.tests.test_drip import TestConstants, create_drip_client
+
+
+def create_event(**kwargs):
+    values = dict(method="POST", endpoint=":account_id/subscribers", status=200, latency=0.02, request_bytes=10,
+                  response_bytes=20, attempt=1, error=None)
+    values.update(kwargs)
+    return RequestEvent(**values)
+
+
+def test_request_metrics_counters():
+    metrics = RequestMetrics()
+    metrics.after_request(create_event())
+    metrics.after_request(create_event(status=429, attempt=2))
+    metrics.after_request(create_event(endpoint=":account_id/subscribers/:id", method="GET", status=None,
+                                       error=ValueError()))
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["errors"] == 2
+    assert snapshot["throttled"] == 1
+    assert snapshot["retries"] == 1
+    assert snapshot["request_bytes"] == 30
+    assert snapshot["statuses"] == {200: 1, 429: 1, None: 1}
+    assert metrics.snapshot(":account_id/subscribers")["requests"] == 2
+    assert metrics.endpoints == [":account_id/subscribers", ":account_id/subscribers/:id"]
+
+
+def test_request_metrics_percentiles():
+    metrics = RequestMetrics()
+    assert metrics.percentile(50) is None
+    for _ in range(98):
+        metrics.after_request(create_event(latency=0.02))
+    metrics.after_request(create_event(latency=0.3))
+    metrics.after_request(create_event(latency=60))
+    assert metrics.percentile(50) == 0.025
+    assert metrics.percentile(99) == 0.5
+    assert metrics.percentile(100) == float('inf')
+    metrics.reset()
+    assert metrics.snapshot()["requests"] == 0
+
+
+class RecordingObserver(RequestObserver):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, method, endpoint, attempt):
+        self.calls.append((method, endpoint, attempt))
+
+    def after_request(self, event):
+        self.calls.append(event)
+
+
+def test_drip_client_notifies_observers(mocker):
+    drip_client = create_drip_client()
+    observer = RecordingObserver()
+    drip_client.observers.append(observer)
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
+    drip_client.update_subscriber_tag_with_new_batch([(TestConstants.test_email, TestConstants.test_tag, None)])
+    before, event = observer.calls
+    assert before == ("POST", ":account_id/subscribers/batches", 1)
+    assert event.status == 202
+    assert event.request_bytes > 0
+    assert event.attempt == 1
+    assert drip_client.metrics.snapshot(":account_id/subscribers/batches")["statuses"] == {202: 1}
+
+
+def test_drip_client_reports_errors(mocker):
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client.session, 'get')
+    drip_client.session.get.side_effect = ValueError()
+    with pytest.raises(ValueError):
+        drip_client.fetch_subscriber(TestConstants.test_subscriber_id)
+    assert drip_client.metrics.snapshot(":account_id/subscribers/:id")["errors"] == 1
+
+
+def test_failing_observer_is_ignored(mocker):
+    drip_client = create_drip_client()
+    observer = mocker.Mock()
+    observer.after_request.side_effect = ValueError()
+    drip_client.observers.append(observer)
+    mocker.patch.object(drip_client.session, 'post')
+    drip_client.session.post.return_value = return_response(202)
+    assert drip_client.send_request(TestConstants.test_request_url) == {}
@@ -0,0 +1,70 @@
+import json
+
+from drip.cache import LocalSubscriberCache
+from drip.drip import DripPy
+from drip.models import Subscriber, SubscriberResponse
+from drip.tests.test_drip import TestConstants
+from drip.transport import InMemoryTransport
+
+SUBSCRIBER = {
+    "id": "z1togz2hcjrkpp5treip",
+    "email": "john@acme.com",
+    "status": "active",
+    "custom_fields": {"shirt_size": "Medium"},
+    "tags": ["Customer", "SEO"],
+    "links": {"account": "9999999"},
+    "ip_address": "111.111.111.11",
+}
+
+
+def test_subscriber():
+    subscriber = Subscriber(SUBSCRIBER)
+    assert subscriber.email == "john@acme.com"
+    assert subscriber.first_name is None
+    assert subscriber.tags == ["Customer", "SEO"]
+    assert subscriber.custom_fields == {"shirt_size": "Medium"}
+    assert subscriber["links"] == {"account": "9999999"}
+    assert subscriber["ip_address"] == "111.111.111.11"
+    assert subscriber.get("first_name", "John") == "John"
+    assert subscriber.get("missing") is None
+    assert subscriber.to_dict() == SUBSCRIBER
+    assert not hasattr(subscriber, "__dict__")
+
+
+def test_subscriber_response():
+    response = SubscriberResponse(json.dumps({"links": {}, "meta": {"page": 1, "total_pages": 1},
+                                              "subscribers": [SUBSCRIBER]}).encode('utf-8'))
+    assert response._subscribers is None
+    assert len(response) == 1
+    assert [subscriber.email for subscriber in response] == ["john@acme.com"]
+    assert response.meta == {"page": 1, "total_pages": 1}
+    assert response.json()["subscribers"] == [SUBSCRIBER]
+    assert SubscriberResponse(b'', 404).subscribers == []
+    assert SubscriberResponse.from_dict({"subscribers": [SUBSCRIBER]}).subscribers[0].to_dict() == SUBSCRIBER
+
+
+def test_fetch_subscriber_typed():
+    body = {"links": {}, "subscribers": [SUBSCRIBER]}
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id,
+                         subscriber_cache=LocalSubscriberCache(),
+                         transport=InMemoryTransport(lambda method, url, headers, data, params: (200, body, None)))
+    response = drip_client.fetch_subscriber("john@acme.com", typed=True)
+    assert isinstance(response, SubscriberResponse)
+    assert response.subscribers[0].tags == ["Customer", "SEO"]
+    assert drip_client.fetch_subscriber(SUBSCRIBER["id"]) == body
+    assert drip_client.fetch_subscriber(SUBSCRIBER["id"], typed=True).subscribers[0].email == "john@acme.com"
+    results = drip_client.fetch_subscribers(["a", "b"], typed=True)
+    assert sorted(results["subscribers"]) == ["a", "b"]
+    assert isinstance(results["subscribers"]["a"], SubscriberResponse)
+
+
+def test_iter_subscribers_typed():
+    def handler(method, url, headers, data, params):
+        subscribers = [dict(SUBSCRIBER, id="{}-{}".format(params["page"], i)) for i in range(2)]
+        return 200, {"meta": {"page": params["page"], "total_pages": 2}, "subscribers": subscribers}, None
+
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id,
+                         transport=InMemoryTransport(handler))
+    subscribers = list(drip_client.iter_subscribers(per_page=2, typed=True))
+    assert [subscriber.id for subscriber in subscribers] == ["1-0", "1-1", "2-0", "2-1"]
+    assert all(isinstance(subscriber, Subscriber) for subscriber in subscribers)
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from drip.pool import AccountTransport, DripClientPool
+from drip.transport import InMemoryTransport
+
+
+def test_pool_shares_transport():
+    transport = InMemoryTransport(record=True)
+    with DripClientPool(transport=transport) as pool:
+        first = pool.add_account("1", "token_1")
+        second = pool.add_account("2", "token_2", requests_per_hour=7200)
+        assert pool.add_account("1", "token_1") is first
+        assert pool.accounts == ["1", "2"]
+        assert "2" in pool and len(pool) == 2
+        assert first.transport.transport is second.transport.transport is transport
+        assert first.rate_limiter is not second.rate_limiter
+        assert second.rate_limiter.requests_per_hour == 7200
+        first.unsubscribe_email("a@example.com")
+        second.unsubscribe_email("b@example.com")
+    assert [request["url"].split("/")[4] for request in transport.requests] == ["1", "2"]
+
+
+def test_pool_per_account_stats():
+    now = [100.0]
+    pool = DripClientPool(transport=InMemoryTransport(), clock=lambda: now[0])
+    pool.add_account("1", "token_1")
+    pool.add_account("2", "token_2")
+    for _ in range(3):
+        pool["1"].unsubscribe_email("a@example.com")
+    now[0] += 2
+    stats = pool.stats()
+    assert stats["1"]["requests"] == 3
+    assert stats["1"]["requests_per_second"] == 1.5
+    assert stats["2"]["requests"] == 0
+    assert stats["2"]["in_flight"] == stats["2"]["queued"] == 0
+
+
+def test_account_transport_bounds_in_flight_requests():
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def handler(method, url, headers, data, params):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return 202, {}, None
+
+    transport = AccountTransport(InMemoryTransport(handler), max_in_flight=2)
+    threads = [threading.Thread(target=transport.send, args=("POST", "url", ("token", ""))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert in_flight[1] == 2
+    assert transport.in_flight == transport.queued == 0
+
+
+def test_pool_close_closes_shared_transport_once(mocker):
+    transport = InMemoryTransport()
+    mocker.patch.object(transport, 'close')
+    pool = DripClientPool(transport=transport)
+    pool.add_account("1", "token_1")
+    pool.add_account("2", "token_2")
+    pool.remove_account("2")
+    assert not transport.close.called
+    pool.close()
+    transport.close.assert_called_once_with()
+    assert len(pool) == 0
@@ -0,0 +1,74 @@
+import multiprocessing
+
+from drip.rate_limit import TokenBucket, parse_retry_after
+from drip.tests import FakeClock
+
+
+def create_bucket(**kwargs):
+    clock = FakeClock(1000.0)
+    return TokenBucket(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_token_bucket_defaults():
+    bucket, clock = create_bucket()
+    assert bucket.burst == 60
+    assert bucket.remaining == 60
+
+
+def test_token_bucket_burst_then_refill():
+    bucket, clock = create_bucket(requests_per_hour=3600, burst=2)
+    assert bucket.acquire(block=False)
+    assert bucket.acquire(block=False)
+    assert not bucket.acquire(block=False)
+    assert bucket.wait_time() == 1.0
+    clock.now += 1
+    assert bucket.remaining == 1
+
+
+def test_token_bucket_blocks_until_refill():
+    bucket, clock = create_bucket(requests_per_hour=360, burst=1)
+    start = clock.now
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert clock.now - start == 10.0
+
+
+def test_token_bucket_timeout():
+    bucket, clock = create_bucket(requests_per_hour=360, burst=1)
+    assert bucket.acquire()
+    assert not bucket.acquire(timeout=5)
+
+
+def test_token_bucket_never_exceeds_burst():
+    bucket, clock = create_bucket(requests_per_hour=3600, burst=5)
+    clock.now += 3600
+    assert bucket.remaining == 5
+
+
+def test_token_bucket_pause():
+    bucket, clock = create_bucket(requests_per_hour=3600, burst=5)
+    bucket.pause(30)
+    assert bucket.remaining == 0
+    assert bucket.wait_time() == 30.0
+    assert bucket.acquire()
+    assert clock.now == 1030.0
+    assert bucket.remaining == 4
+
+
+def _drain(bucket):
+    bucket.acquire(tokens=3, block=False)
+
+
+def test_token_bucket_shared_between_processes():
+    bucket = TokenBucket(requests_per_hour=36, burst=5, shared=True)
+    process = multiprocessing.Process(target=_drain, args=(bucket, ))
+    process.start()
+    process.join()
+    assert bucket.remaining == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) == 60.0
+    assert parse_retry_after("soon", default=5) == 5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", clock=lambda: 1445412470.0) == 10.0
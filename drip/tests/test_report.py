@@ -0,0 +1,100 @@
+import json
+
+from drip.drip_retry import RetryPolicy
+from drip.report import BatchReport, PartitionResult
+from drip.tests import return_response
+from drip.tests.test_drip import TestConstants, create_drip_client
+
+
+def create_result(**kwargs):
+    values = dict(index=0, status=202, latency=0.1, attempts=1, emails=["a@example.com"], error=None, records=None)
+    values.update(kwargs)
+    return PartitionResult(**values)
+
+
+def test_partition_result_ok():
+    assert create_result().ok
+    assert create_result(status=200).ok
+    assert not create_result(status=422).ok
+    assert not create_result(status=None, error=ValueError()).ok
+
+
+def test_batch_report():
+    report = BatchReport(TestConstants.test_request_url, None, None)
+    report.add(create_result())
+    report.add(create_result(index=1, status=500, emails=["b@example.com", "c@example.com"]))
+    assert len(report) == 2
+    assert not report.ok
+    assert [partition.index for partition in report.succeeded] == [0]
+    assert [partition.index for partition in report.failed] == [1]
+    assert report.failed_emails == ["b@example.com", "c@example.com"]
+
+
+def test_batch_report_records_attempts_and_status(mocker):
+    list_of_subscribers = [("{}{}".format(i, TestConstants.test_email), TestConstants.test_tag, None)
+                           for i in range(1500)]
+    drip_client = create_drip_client()
+    drip_client.retry_policy = RetryPolicy(tries=3, sleep=lambda seconds: None)
+    mocker.patch.object(drip_client, "dispatch", side_effect=[
+        return_response(503), return_response(202), return_response(422)])
+    report = drip_client.update_subscriber_tag_with_new_batch(list_of_subscribers)
+    first, second = report.partitions
+    assert (first.status, first.attempts, first.records) == (202, 2, None)
+    assert first.emails == [subscriber[0] for subscriber in list_of_subscribers[:1000]]
+    assert (second.status, second.attempts) == (422, 1)
+    assert second.records == list_of_subscribers[1000:]
+    assert first.latency >= 0
+
+
+def test_resend_failed_sends_failed_partitions_only(mocker):
+    subscribers = [{"email": "{}{}".format(i, TestConstants.test_email), "tags": [TestConstants.test_tag]}
+                   for i in range(2500)]
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "dispatch", side_effect=[
+        return_response(202), return_response(500), return_response(202)])
+    report = drip_client.update_subscribers(subscribers)
+    assert [partition.index for partition in report.failed] == [1]
+
+    drip_client.dispatch.side_effect = None
+    drip_client.dispatch.return_value = return_response(202)
+    resent = drip_client.resend_failed(report)
+    assert drip_client.dispatch.call_count == 4
+    sent = json.loads(drip_client.dispatch.call_args[0][1])["batches"][0]["subscribers"]
+    assert sent == subscribers[1000:2000]
+    assert [partition.index for partition in resent] == [1]
+    assert resent.ok
+
+
+def test_invalid_records_fail_their_partition(mocker):
+    subscribers = [{"email": "{}{}".format(i, TestConstants.test_email)} for i in range(2500)]
+    subscribers[1500] = {"tags": [TestConstants.test_tag]}
+    for workers in (1, 3):
+        drip_client = create_drip_client()
+        mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
+        report = drip_client.update_subscribers(subscribers, workers=workers)
+        assert [partition.index for partition in report.failed] == [1]
+        assert isinstance(report.failed[0].error, KeyError)
+        assert report.failed[0].records == subscribers[1000:2000]
+        assert len(report.succeeded) == 2
+
+    # Records are split by email before being sent, those without one are sent apart from the others
+    subscribers[2000] = {"email": None}
+    drip_client = create_drip_client()
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
+    report = drip_client.update_subscribers(subscribers, workers=3, preserve_order=True)
+    assert len(report.failed) == 1
+    assert isinstance(report.failed[0].error, KeyError)
+    assert report.failed[0].records == [subscribers[1500], subscribers[2000]]
+    assert sum(len(partition.emails) for partition in report.succeeded) == 2498
+
+
+def test_cache_errors_do_not_fail_their_partition(mocker):
+    drip_client = create_drip_client()
+    drip_client.subscriber_cache = mocker.Mock()
+    drip_client.subscriber_cache.get_many.side_effect = IOError("cache down")
+    mocker.patch.object(drip_client, "dispatch", return_value=return_response(202))
+    report = drip_client.update_subscriber_tag_with_new_batch([(TestConstants.test_email, TestConstants.test_tag,
+                                                                None)])
+    assert report.ok
+    assert report.succeeded[0].emails == [TestConstants.test_email]
+    assert report.succeeded[0].records is None
@@ -0,0 +1,35 @@
+import gzip
+import io
+import json
+
+from drip.serializers import encode_payload, fastest_json_encoder, gzip_compress, is_gzipped
+
+
+def test_encode_payload_default():
+    assert encode_payload({"subscribers": []}) == json.dumps({"subscribers": []})
+
+
+def test_encode_payload_passes_encoded_bodies_through():
+    assert encode_payload(b'{"subscribers": []}') == b'{"subscribers": []}'
+    assert encode_payload(u'{"subscribers": []}') == u'{"subscribers": []}'
+
+
+def test_encode_payload_custom_serializer():
+    assert encode_payload({"a": 1}, serializer=lambda payload: "encoded") == "encoded"
+
+
+def test_encode_payload_compresses_above_threshold():
+    payload = {"subscribers": [{"email": "{}@example.com".format(i)} for i in range(100)]}
+    assert not is_gzipped(encode_payload(payload, compress_threshold=100000))
+    data = encode_payload(payload, compress_threshold=100)
+    assert is_gzipped(data)
+    assert json.loads(gzip.GzipFile(fileobj=io.BytesIO(data)).read().decode('utf-8')) == payload
+    assert encode_payload(data, compress_threshold=100) == data
+
+
+def test_gzip_compress_round_trip():
+    assert gzip.GzipFile(fileobj=io.BytesIO(gzip_compress(b"drip"))).read() == b"drip"
+
+
+def test_fastest_json_encoder():
+    assert json.loads(fastest_json_encoder()({"a": 1})) == {"a": 1}
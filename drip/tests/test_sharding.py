@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from drip.exceptions import DripError
+from drip.helpers import email_lane
+from drip.sharding import ShardedSync
+from drip.tests.test_drip import TestConstants
+from drip.transport import InMemoryTransport
+
+
+def handler(method, url, headers, data, params):
+    subscribers = json.loads(data)["batches"][0]["subscribers"]
+    if any(subscriber["email"] == "bad@example.com" for subscriber in subscribers):
+        return 500, {}, None
+    return 201, {}, None
+
+
+def create_sync(shards=3, **options):
+    return ShardedSync(TestConstants.test_token, TestConstants.test_account_id, shards=shards,
+                       requests_per_hour=3600000, transport=InMemoryTransport(handler), **options)
+
+
+def test_update_subscriber_tag_with_new_batch_merges_shards():
+    subscribers = [("user{}@example.com".format(i), "tag", None) for i in range(2500)]
+    progress = []
+    sync = create_sync()
+    report = sync.update_subscriber_tag_with_new_batch(subscribers, on_progress=lambda shard, result: progress.append(
+        (shard, result.index)))
+
+    assert report.ok
+    assert [partition.index for partition in report] == list(range(len(report)))
+    assert sorted(email for partition in report for email in partition.emails) == sorted(s[0] for s in subscribers)
+    for partition in report:
+        assert len(set(email_lane(email, 3) for email in partition.emails)) == 1
+    assert len(progress) == len(report)
+    assert sum(shard["records"] for shard in sync.progress.values()) == 2500
+    assert sum(shard["partitions"] for shard in sync.progress.values()) == len(report)
+
+
+def test_update_subscribers_reports_failed_shard():
+    subscribers = [{"email": "user{}@example.com".format(i), "tags": ["tag"]} for i in range(10)]
+    subscribers.append({"email": "bad@example.com", "tags": ["tag"]})
+    sync = create_sync()
+    report = sync.update_subscribers(subscribers)
+
+    assert not report.ok
+    assert len(report.failed) == 1
+    assert report.failed[0].status == 500
+    assert "bad@example.com" in report.failed_emails
+    assert sync.progress[email_lane("bad@example.com", 3)]["failed"] == 1
+
+
+def test_update_subscribers_reports_records_without_email():
+    subscribers = [{"email": "user{}@example.com".format(i), "tags": ["tag"]} for i in range(10)]
+    subscribers.insert(5, {"tags": ["tag"]})
+    sync = create_sync()
+    report = sync.update_subscribers(subscribers)
+
+    assert len(report.failed) == 1
+    assert isinstance(report.failed[0].error, KeyError)
+    assert report.failed[0].records == [{"tags": ["tag"]}]
+    assert sorted(email for partition in report.succeeded for email in partition.emails) == sorted(
+        subscriber["email"] for subscriber in subscribers if "email" in subscriber)
+
+
+def test_dead_shard_raises():
+    sync = create_sync(shards=2, unknown_option=True)
+    with pytest.raises(DripError):
+        sync.update_subscriber_tag_with_new_batch([("user@example.com", "tag", None)])
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from requests import exceptions as requests_exceptions
+
+from drip.drip import DripPy
+from drip.tests.test_drip import TestConstants
+from drip.transport import InMemoryResponse, InMemoryTransport, RequestsTransport, Transport
+
+
+def test_drip_py_uses_requests_transport_by_default():
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id, pool_maxsize=5)
+    assert isinstance(drip_client.transport, RequestsTransport)
+    assert drip_client.session is drip_client.transport.session
+
+
+def test_transport_interface():
+    with pytest.raises(NotImplementedError):
+        Transport().send("GET", TestConstants.test_request_url, ('test_token', ''))
+
+
+def test_requests_transport_send(mocker):
+    transport = RequestsTransport()
+    mocker.patch.object(transport.session, 'post')
+    mocker.patch.object(transport.session, 'get')
+    transport.send("POST", TestConstants.test_request_url, ('test_token', ''), headers={}, data='{}', timeout=5)
+    transport.session.post.assert_called_once_with(TestConstants.test_request_url, auth=('test_token', ''),
+                                                   headers={}, data='{}', timeout=5)
+    transport.send("GET", TestConstants.test_request_url, ('test_token', ''), params={"page": 1})
+    transport.session.get.assert_called_once_with(TestConstants.test_request_url, auth=('test_token', ''),
+                                                  params={"page": 1}, timeout=None)
+
+
+def test_in_memory_transport_records_requests():
+    transport = InMemoryTransport(record=True)
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id, transport=transport)
+    assert drip_client.session is None
+    drip_client.add_subscriber_tag("test@example.com", "Customer")
+    assert len(transport.requests) == 1
+    request = transport.requests[0]
+    assert request["method"] == "POST"
+    assert request["url"] == "https://api.getdrip.com/v2/{}/subscribers".format(TestConstants.test_account_id)
+    assert json.loads(request["data"]) == {"subscribers": [{"email": "test@example.com", "tags": ["Customer"]}]}
+
+
+def test_in_memory_transport_handler():
+    def handler(method, url, headers, data, params):
+        return 200, {"subscribers": [{"id": url.rsplit("/", 1)[-1]}]}, {"X-Test": "1"}
+
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id,
+                         transport=InMemoryTransport(handler))
+    assert drip_client.fetch_subscriber("123") == {"subscribers": [{"id": "123"}]}
+    assert drip_client.metrics.snapshot()["statuses"] == {200: 1}
+
+
+def test_in_memory_response():
+    response = InMemoryResponse(429, b'{"errors": []}', {"Retry-After": "5"})
+    assert response.headers["retry-after"] == "5"
+    assert response.text == '{"errors": []}'
+    assert response.json() == {"errors": []}
+
+
+def test_close_closes_transport(mocker):
+    transport = InMemoryTransport()
+    mocker.patch.object(transport, 'close')
+    with DripPy(TestConstants.test_token, TestConstants.test_account_id, transport=transport):
+        pass
+    transport.close.assert_called_once_with()
+
+
+def test_httpx_transport():
+    httpx = pytest.importorskip("httpx")
+    from drip.transport import HTTPXTransport
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(202, json={})
+
+    transport = HTTPXTransport(http2=False)
+    transport.client = httpx.Client(transport=httpx.MockTransport(handler))
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id, transport=transport,
+                         timeout=(3.05, 27))
+    drip_client.add_subscriber_tag("test@example.com", "Customer")
+    assert requests[0].method == "POST"
+    assert requests[0].headers["content-type"] == "application/json"
+    assert json.loads(requests[0].content.decode('utf-8'))["subscribers"][0]["email"] == "test@example.com"
+    assert requests[0].extensions["timeout"]["connect"] == 3.05
+    assert requests[0].extensions["timeout"]["read"] == 27
+    drip_client.close()
+
+
+def test_httpx_transport_errors_are_retried():
+    httpx = pytest.importorskip("httpx")
+    from drip.drip_retry import RetryPolicy
+    from drip.transport import HTTPXTransport
+
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("Connection refused", request=request)
+        if len(attempts) == 2:
+            raise httpx.ReadTimeout("Timed out", request=request)
+        return httpx.Response(202, json={})
+
+    transport = HTTPXTransport(http2=False)
+    transport.client = httpx.Client(transport=httpx.MockTransport(handler))
+    drip_client = DripPy(TestConstants.test_token, TestConstants.test_account_id, transport=transport,
+                         retry_policy=RetryPolicy(tries=3, sleep=lambda seconds: None))
+    assert drip_client.add_subscriber_tag("test@example.com", "Customer") == 202
+    assert len(attempts) == 3
+    error = transport.translate_error(httpx.ConnectTimeout("Timed out"))
+    assert isinstance(error, requests_exceptions.ConnectTimeout)
+    assert isinstance(error.__cause__, httpx.ConnectTimeout)
+    drip_client.close()
@@ -1,7 +1,57 @@
+import json
+
 from requests import Response
 
+from drip.drip import DripPy
+from drip.transport import InMemoryTransport
+
 
 def return_response(status_code=200):
     resp = Response()
     resp.status_code = status_code
     return resp
+
+
+class FakeClock(object):
+    """
+    A clock for the clock and sleep arguments of time based classes, sleeping moves it forward
+    """
+    def __init__(self, now=0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create_in_memory_drip_client(handler=None, statuses=(), **options):
+    """
+    Creates a DripPy whose requests are answered and recorded in drip_client.transport.requests by an
+    InMemoryTransport
+    Args:
+        handler: Optional, see InMemoryTransport, by default requests are answered with statuses in turn then 202
+        statuses (iterable): Optional, status codes of the first responses
+        options: Optional, other DripPy arguments
+    """
+    # test_drip imports this package, so its constants are only read once it is imported
+    from drip.tests.test_drip import TestConstants
+    statuses = list(statuses)
+
+    def answer(method, url, headers, data, params):
+        return statuses.pop(0) if statuses else 202, {}, None
+
+    return DripPy(TestConstants.test_token, TestConstants.test_account_id,
+                  transport=InMemoryTransport(handler or answer, record=True), **options)
+
+
+def sent_subscribers(drip_client):
+    """
+    Returns:
+        list: The subscribers of every batch sent by a client of create_in_memory_drip_client
+    """
+    return [subscriber for request in drip_client.transport.requests
+            for subscriber in json.loads(request["data"])["batches"][0]["subscribers"]]
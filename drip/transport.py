@@ -0,0 +1,175 @@
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# (connect, read) seconds, connecting fails fast while a slow batch still has time to be processed
+DEFAULT_TIMEOUT = (3.05, 30)
+
+
+class Transport(object):
+    """
+    Interface of the HTTP stacks DripPy sends its requests through
+    Connection errors and timeouts are raised as requests exceptions, whatever the HTTP stack, so that
+    RetryPolicy retries them the same way
+    """
+    def send(self, method, url, auth, headers=None, data=None, params=None, timeout=None):
+        """
+        Sends one HTTP request
+        Args:
+            method (str): GET or POST
+            url (str): The URL to request from
+            auth (tuple): (username, password) for basic auth
+            headers (dict): Optional, request headers
+            data (str or bytes): Optional, request body
+            params (dict): Optional, query params
+            timeout (float or tuple): Optional, timeout in seconds or a (connect, read) tuple
+
+        Returns:
+            A response exposing status_code, headers, content, text and json()
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases the connections held by the transport
+        """
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Sends requests through a pooled keep-alive requests.Session, the default transport
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False):
+        """
+        Args:
+            pool_connections (int): Optional, number of per-host connection pools to keep
+            pool_maxsize (int): Optional, max number of keep-alive connections per host
+            pool_block (bool): Optional, block instead of opening extra connections once a host pool is full
+        """
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def send(self, method, url, auth, headers=None, data=None, params=None, timeout=None):
+        if method == "POST":
+            return self.session.post(url, auth=auth, headers=headers, data=data, timeout=timeout)
+        return self.session.get(url, auth=auth, params=params, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXTransport(Transport):
+    """
+    Sends requests through a pooled httpx.Client, multiplexing them over HTTP/2 connections when enabled
+    Requires httpx, and h2 for HTTP/2 (pip install drip-py[http2]). httpx errors are raised as the
+    matching requests exceptions, see translate_error
+    """
+    def __init__(self, http2=True, max_connections=10, max_keepalive_connections=10):
+        """
+        Args:
+            http2 (bool): Optional, negotiate HTTP/2 with the server
+            max_connections (int): Optional, max number of open connections
+            max_keepalive_connections (int): Optional, max number of idle connections kept alive
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTPXTransport requires httpx, install it with `pip install drip-py[http2]`")
+        self.httpx = httpx
+        self.client = httpx.Client(http2=http2, limits=httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive_connections))
+
+    def send(self, method, url, auth, headers=None, data=None, params=None, timeout=None):
+        if isinstance(timeout, tuple):
+            timeout = self.httpx.Timeout(None, connect=timeout[0], read=timeout[1])
+        else:
+            timeout = self.httpx.Timeout(timeout)
+        try:
+            return self.client.request(method, url, auth=auth, headers=headers, content=data, params=params,
+                                       timeout=timeout)
+        except self.httpx.TransportError as e:
+            raise self.translate_error(e)
+
+    def translate_error(self, error):
+        """
+        Args:
+            error (httpx.TransportError): The error raised by httpx
+
+        Returns:
+            requests.exceptions.RequestException: The matching requests exception, its __cause__ is the httpx error
+        """
+        httpx = self.httpx
+        exceptions = requests.exceptions
+        if isinstance(error, httpx.ConnectTimeout):
+            translated = exceptions.ConnectTimeout(str(error))
+        elif isinstance(error, httpx.ReadTimeout):
+            translated = exceptions.ReadTimeout(str(error))
+        elif isinstance(error, httpx.TimeoutException):
+            translated = exceptions.Timeout(str(error))
+        elif isinstance(error, httpx.RemoteProtocolError):
+            translated = exceptions.ChunkedEncodingError(str(error))
+        else:
+            translated = exceptions.ConnectionError(str(error))
+        translated.__cause__ = error
+        return translated
+
+    def close(self):
+        self.client.close()
+
+
+class InMemoryResponse(object):
+    """
+    The response returned by InMemoryTransport
+    """
+    def __init__(self, status_code=200, content=b'', headers=None):
+        """
+        Args:
+            status_code (int): Optional, the response status code
+            content (bytes): Optional, the response body
+            headers (dict): Optional, the response headers
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class InMemoryTransport(Transport):
+    """
+    Answers requests from a handler function without any network access, for tests,
+    load tests and replaying recorded traffic
+    """
+    def __init__(self, handler=None, record=False):
+        """
+        Args:
+            handler: Optional, callable taking (method, url, headers, data, params) and returning a
+                     (status_code, body, headers) tuple, body being a payload to encode as JSON or bytes.
+                     Answers every request with 202 and {} by default
+            record (bool): Optional, keep every request in self.requests
+        """
+        self.handler = handler or (lambda method, url, headers, data, params: (202, {}, None))
+        self.record = record
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send(self, method, url, auth, headers=None, data=None, params=None, timeout=None):
+        if self.record:
+            with self._lock:
+                self.requests.append({"method": method, "url": url, "headers": headers, "data": data,
+                                      "params": params})
+        status_code, body, response_headers = self.handler(method, url, headers, data, params)
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        return InMemoryResponse(status_code, body, response_headers)
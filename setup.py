@@ -11,6 +11,10 @@ setup(
     name='drip-py',
     version='0.1',
     packages=find_packages(),
+    extras_require={
+        'async': ['aiohttp'],
+        'http2': ['httpx[http2]'],
+    },
     include_package_data=True,
     license='MIT License',
     description='A Python wrapper for getdrip.com REST API.',